@@ -0,0 +1,119 @@
+﻿import os
+import sys
+import time
+import argparse
+from array import array
+from satranc_motoru import GameState, BITBASE_DIR, BITBASE_PIECES, BITBASE_SIZE, bitbase_index, write_bitbase
+
+# ==========================================
+# BİTBAZ ÜRETİCİ: GERİYE DOĞRU ANALİZ (KPK, KRK, KQK)
+# ==========================================
+# Her konumun yasal hamleleri GameState ile bir kez üretilir, ardından matlardan geriye doğru yayılım yapılır:
+# güçlü tarafın sırasıysa kazanan tek hamle yeter (en kısa mat), zayıf tarafın sırasıysa tüm hamleler kaybettirmeli (en uzun direnç).
+# KPK, terfi sonrası konumlar için KQK ve KRK tablolarını kullanır; bu yüzden en son üretilir.
+# Kullanım: python bitbaz_uret.py [--dir bitbaz] [--only Q R P]
+
+GENERATION_ORDER = ("Q", "R", "P")
+
+def empty_state():
+    gs = GameState()
+    gs.board = [["--"] * 8 for _ in range(8)]
+    gs.castle_rights = 0; gs.en_passant_possible = -1
+    return gs
+
+def build_graph(piece, finished):
+    # Her yasal konum için: terminal değer (mat = 0) ya da ardılların listesi.
+    # Dönüş: ardıl sayaçları, öncül kenarları (ardıl, öncül), matlar ve tablo dışına çıkan kazançlar (terfi) için tohumlar.
+    gs = empty_state(); board = gs.board
+    remaining = array('i', [-1]) * BITBASE_SIZE  # -1: yasa dışı / sonuçsuz; zayıf sırada çözülmemiş ardıl sayısı
+    edge_from = array('i'); edge_to = array('i')
+    seeds = []  # (mata kalan yarım hamle, indeks)
+    for strong_king in range(64):
+        for weak_king in range(64):
+            if weak_king == strong_king or (abs((weak_king >> 3) - (strong_king >> 3)) <= 1 and abs((weak_king & 7) - (strong_king & 7)) <= 1): continue
+            for piece_sq in range(64):
+                if piece_sq == strong_king or piece_sq == weak_king: continue
+                if piece == "P" and (piece_sq < 8 or piece_sq >= 56): continue
+                board[strong_king >> 3][strong_king & 7] = "wK"; board[weak_king >> 3][weak_king & 7] = "bK"
+                board[piece_sq >> 3][piece_sq & 7] = "w" + piece
+                gs.white_king_location = (strong_king >> 3, strong_king & 7); gs.black_king_location = (weak_king >> 3, weak_king & 7)
+                for strong_to_move in (True, False):
+                    gs.white_to_move = strong_to_move
+                    # Sırası gelmeyen taraf şah altında olamaz (yalnızca zayıf şah için mümkün)
+                    if strong_to_move and gs.is_attacked(weak_king >> 3, weak_king & 7, 'w'): continue
+                    index = bitbase_index(strong_to_move, strong_king, weak_king, piece_sq)
+                    codes = gs.get_valid_move_codes()
+                    if not codes:
+                        if gs.in_check_flag and not strong_to_move: seeds.append((0, index))  # mat
+                        continue  # pat ya da beyazın kaybı (olamaz): beraberlik
+                    remaining[index] = len(codes)
+                    for code in codes:
+                        start = code & 63; end = (code >> 6) & 63; promotion = code >> 15
+                        if strong_to_move:
+                            if start == strong_king: successor = bitbase_index(False, end, weak_king, piece_sq)
+                            elif promotion:
+                                # Terfi: vezir/kale tablosundaki sonuç tohum olur; at/fil terfisi beraberliktir
+                                promoted = "NBRQ"[promotion - 1]
+                                value = finished[promoted][bitbase_index(False, strong_king, weak_king, end)] if promoted in finished else 0
+                                if value: seeds.append((value, index))  # terfi edilen konum value - 1 yarım hamlede mat, buradan bir fazlası
+                                continue
+                            else: successor = bitbase_index(False, strong_king, weak_king, end)
+                        else:
+                            if end == piece_sq: continue  # taş alındı: şah - şah beraberliği, bu ardıl hiç kazanç olmaz
+                            successor = bitbase_index(True, strong_king, end, piece_sq)
+                        edge_from.append(successor); edge_to.append(index)
+                board[strong_king >> 3][strong_king & 7] = "--"; board[weak_king >> 3][weak_king & 7] = "--"
+                board[piece_sq >> 3][piece_sq & 7] = "--"
+    return remaining, edge_from, edge_to, seeds
+
+def retrograde(remaining, edge_from, edge_to, seeds):
+    # Öncül listeleri (CSR) kurulur, sonra mata kalan yarım hamleye göre kova kuyruğuyla yayılım yapılır.
+    # Değer = yarım hamle + 1 (0 beraberlik); kovalar artan sırada işlendiği için güçlü taraf en kısa, zayıf taraf en uzun yolu alır.
+    offsets = array('i', [0]) * (BITBASE_SIZE + 1)
+    for successor in edge_from: offsets[successor + 1] += 1
+    for i in range(BITBASE_SIZE): offsets[i + 1] += offsets[i]
+    fill = array('i', offsets); predecessors = array('i', [0]) * len(edge_from)
+    for successor, index in zip(edge_from, edge_to):
+        predecessors[fill[successor]] = index; fill[successor] += 1
+    values = [0] * BITBASE_SIZE
+    buckets = {}
+    for distance, index in seeds: buckets.setdefault(distance, []).append(index)
+    distance = 0
+    while buckets:
+        for index in buckets.pop(distance, ()):
+            if values[index]: continue
+            values[index] = distance + 1
+            for p in range(offsets[index], offsets[index + 1]):
+                parent = predecessors[p]
+                if values[parent]: continue
+                if parent >> 18 == 0: buckets.setdefault(distance + 1, []).append(parent)  # güçlü taraf: bir kazanç yeter
+                else:
+                    remaining[parent] -= 1
+                    if remaining[parent] == 0: buckets.setdefault(distance + 1, []).append(parent)  # zayıf taraf: tüm kaçışlar kaybetti
+        distance += 1
+    return values
+
+def generate(piece, finished):
+    return retrograde(*build_graph(piece, finished))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KPK, KRK ve KQK son oyun bitbazlarını geriye doğru analizle üretir.")
+    parser.add_argument("--dir", default=BITBASE_DIR, help="Çıktı klasörü (varsayılan: motorun okuduğu bitbaz/)")
+    parser.add_argument("--only", nargs="+", choices=BITBASE_PIECES, help="Yalnızca bu taş türleri (P için Q ve R de üretilir)")
+    args = parser.parse_args(argv)
+    wanted = set(args.only or BITBASE_PIECES)
+    if "P" in wanted: wanted |= {"Q", "R"}
+    os.makedirs(args.dir, exist_ok=True)
+    finished = {}
+    for piece in GENERATION_ORDER:
+        if piece not in wanted: continue
+        start = time.perf_counter()
+        values = generate(piece, finished); finished[piece] = values
+        filename = os.path.join(args.dir, f"k{piece.lower()}k.bin")
+        bits, size = write_bitbase(values, filename)
+        wins = sum(1 for v in values if v)
+        print(f"✅ K{piece}K: {wins:,} kazanç, en uzun mat {max(values) - 1} yarım hamle, {bits} bit/kayıt, {size:,} bayt -> {filename} ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
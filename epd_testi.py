@@ -0,0 +1,133 @@
+﻿import os
+import sys
+import time
+import random
+import argparse
+from satranc_motoru import ChessAI, GameState, OpeningBook, BACKENDS, move_uci
+
+# ==========================================
+# EPD TEST TAKIMI: TAKTİK GÜCÜN ÖLÇÜLMESİ
+# ==========================================
+# EPD satırı: dört FEN alanı + ';' ile ayrılmış işlemler (bm = en iyi hamle(ler), am = kaçınılacak hamle(ler), id = ad).
+# Konum başına find_best_move_smart sabit süre ya da derinlikle çalışır; her derinliğin sonucu izlenir ve
+# doğru hamlenin ilk bulunup aramanın sonuna kadar korunduğu derinlik, süre ve düğüm sayısı raporlanır.
+# Kullanım:
+#   python epd_testi.py takim.epd --time 2
+#   python epd_testi.py takim.epd --depth 5 --workers 4 --backend bitboard
+
+def parse_epd(line):
+    # "<FEN alanları> bm Qg6; id \"WAC.001\";" -> (fen, {"bm": ["Qg6"], "id": ["WAC.001"]})
+    fields = line.split()
+    if len(fields) < 4: raise ValueError(f"Geçersiz EPD: {line}")
+    fen = " ".join(fields[:4]); rest = line.split(None, 4)[4] if len(fields) > 4 else ""
+    operations = {}
+    for operation in filter(None, (part.strip() for part in rest.split(";"))):
+        opcode, _, operands = operation.partition(" ")
+        operations[opcode] = [operand.strip('"') for operand in operands.split()] if opcode != "id" else [operands.strip().strip('"')]
+    # hmvc/fmvn işlemleri FEN'in son iki alanına karşılık gelir
+    fen += f" {operations.get('hmvc', ['0'])[0]} {operations.get('fmvn', ['1'])[0]}"
+    return fen, operations
+
+def load_suite(filename):
+    positions = []
+    with open(filename, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            fen, operations = parse_epd(line)
+            gs = GameState().load_fen(fen)
+            codes = gs.get_valid_move_codes()
+            best = [gs.parse_san(m, codes) for m in operations.get("bm", [])]; avoid = [gs.parse_san(m, codes) for m in operations.get("am", [])]
+            if None in best or None in avoid or not (best or avoid): raise ValueError(f"{filename}:{number}: bm/am hamlesi çözülemedi: {line}")
+            positions.append({"id": operations.get("id", [str(number)])[0], "fen": fen,
+                              "bm": [move_uci(c) for c in best], "am": [move_uci(c) for c in avoid],
+                              "expected": " ".join(operations.get("bm", []) or ["!" + m for m in operations.get("am", [])])})
+    return positions
+
+def is_correct(position, uci):
+    if position["bm"] and uci not in position["bm"]: return False
+    return uci not in position["am"]
+
+_worker_ai = None
+
+def _worker_init():
+    global _worker_ai
+    _worker_ai = ChessAI(); _worker_ai.verbose = False
+    _worker_ai.opening_book.close(); _worker_ai.opening_book = OpeningBook("")  # test konumları kitaptan çözülmesin
+
+def solve(position, time_limit, fixed_depth, backend="mailbox", ai=None):
+    # Tek konum: her derinlik kaydedilir; çözüm, sondan geriye doğru kesintisiz doğru kalan ilk derinliktir.
+    # TT ve geçmiş tablosu sıfırlanır, kök karıştırması FEN'e göre tohumlanır: sonuç işçinin önceki konumlarına (--workers) bağlı olmaz
+    ai = ai if ai is not None else _worker_ai
+    ai.tt.clear(); iterations = []
+    for table in ai.history.values(): table[:] = [0] * 64
+    random.seed(position["fen"])
+    ai.on_iteration = iterations.append
+    gs = BACKENDS[backend]().load_fen(position["fen"])
+    start = time.perf_counter()
+    best_move, score, nodes, depth = ai.find_best_move_smart(gs, gs.get_valid_moves(), time_limit, fixed_depth)
+    elapsed = time.perf_counter() - start
+    ai.on_iteration = None
+    solution = None
+    for entry in reversed(iterations):
+        if not is_correct(position, entry["move"]): break
+        solution = entry
+    san = gs.get_san(best_move.move_id)
+    solved = is_correct(position, best_move.get_uci())
+    if not solved: solution = None
+    return {"id": position["id"], "expected": position["expected"], "move": san, "solved": solved, "elapsed": elapsed, "nodes": nodes,
+            "depth": depth, "solution": None if solution is None else (solution["depth"], solution["elapsed"], solution["nodes"])}
+
+def run_suite(positions, time_limit, fixed_depth, workers, on_result=None, backend="mailbox"):
+    results = []
+    if workers <= 1:
+        _worker_init()
+        for position in positions:
+            results.append(solve(position, time_limit, fixed_depth, backend))
+            if on_result: on_result(results[-1], len(results))
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"), initializer=_worker_init) as pool:
+            futures = {pool.submit(solve, position, time_limit, fixed_depth, backend): i for i, position in enumerate(positions)}
+            for future in as_completed(futures):
+                results.append(dict(future.result(), index=futures[future]))
+                if on_result: on_result(results[-1], len(results))
+            results.sort(key=lambda r: r["index"])
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EPD test takımını çözer; çözüm oranı ve çözüme kadar geçen süre/derinlik/düğüm raporlanır.")
+    parser.add_argument("epd_file", help="bm/am işlemli EPD dosyası")
+    parser.add_argument("--time", type=float, help="Konum başına süre (saniye)")
+    parser.add_argument("--depth", type=int, help="Konum başına sabit derinlik")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Paralel konum sayısı")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="mailbox", help="Aramada kullanılan konum gösterimi")
+    args = parser.parse_args(argv)
+    if args.time is None and args.depth is None: args.time = 1.0
+    try: positions = load_suite(args.epd_file)
+    except (ValueError, OSError) as e: parser.error(str(e))
+
+    def report(result, done):
+        if result["solved"]:
+            depth, elapsed, nodes = result["solution"]
+            status = f"✅ derinlik {depth}, {elapsed:.2f}s, {nodes:,} düğüm"
+        else: status = f"❌ beklenen {result['expected']}"
+        print(f"[{done}/{len(positions)}] {result['id']:<12} {result['move']:<8} {status}")
+    start = time.perf_counter()
+    results = run_suite(positions, args.time, args.depth, max(1, args.workers), report, args.backend)
+
+    solved = [r for r in results if r["solved"]]
+    print(f"\nÇözülen: {len(solved)}/{len(results)} (%{100 * len(solved) / len(results):.1f})")
+    if solved:
+        n = len(solved)
+        print(f"Çözüme kadar ortalama: {sum(r['solution'][1] for r in solved) / n:.2f}s, "
+              f"derinlik {sum(r['solution'][0] for r in solved) / n:.1f}, {sum(r['solution'][2] for r in solved) / n:,.0f} düğüm")
+    total_nodes = sum(r["nodes"] for r in results); total_time = sum(r["elapsed"] for r in results)
+    print(f"Toplam: {total_nodes:,} düğüm, {total_time:.1f}s arama ({total_nodes / total_time if total_time else 0:,.0f} düğüm/s), {time.perf_counter() - start:.1f}s duvar saati")
+    failed = [r["id"] for r in results if not r["solved"]]
+    if failed: print("Çözülemeyenler: " + ", ".join(failed))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,15 @@
 ﻿import sys
 import random
-import time
-import json
 import os
-import copy
 import math
+import multiprocessing
 from PyQt6.QtWidgets import (QApplication, QWidget, QHBoxLayout, QVBoxLayout, 
                              QLabel, QProgressBar, QSpinBox, QFrame, QTableWidget, 
                              QTableWidgetItem, QHeaderView, QPushButton, QMessageBox, 
                              QCheckBox, QTextEdit, QDialog, QDialogButtonBox, QComboBox, QLCDNumber, QGroupBox)
 from PyQt6.QtGui import QPainter, QColor, QFont, QPen, QPolygonF
 from PyQt6.QtCore import Qt, QRect, QThread, pyqtSignal, QTimer, QPointF
+from satranc_motoru import ChessAI, GameState, Move
 
 # ==========================================
 # 0. BÖLÜM: GİRİŞ EKRANI
@@ -63,6 +62,7 @@ class StartDialog(QDialog):
 # ==========================================
 class BotWorker(QThread):
     finished = pyqtSignal(object, float, int, int) 
+    iteration = pyqtSignal(dict)  # tamamlanan her derinliğin telemetri kaydı
 
     def __init__(self, ai, gs_clone, valid_moves, time_limit, fixed_depth=None):
         super().__init__()
@@ -78,10 +78,13 @@ class BotWorker(QThread):
         try:
             if self.fixed_depth:
                 print(f"\n🧠 Bot Düşünüyor... (Hedef Derinlik: {self.fixed_depth})")
-            else:
+            elif self.time_limit:
                 print(f"\n🧠 Bot Düşünüyor... (Süre Limiti: {self.time_limit:.2f}s)")
+            else:
+                print("\n🧠 Bot rakibin süresinde düşünüyor... (Ponder)")
             
             self.ai.nodes_visited = 0
+            self.ai.on_iteration = self.iteration.emit
             
             best_move, score, nodes, max_depth = self.ai.find_best_move_smart(
                 self.gs, self.valid_moves, self.time_limit, self.fixed_depth
@@ -95,445 +98,7 @@ class BotWorker(QThread):
             print(f"Bot Kritik Hata: {e}")
 
 # ==========================================
-# 2. BÖLÜM: YAPAY ZEKA
-# ==========================================
-class OpeningBook:
-    def __init__(self, brain_file="beyin.json"):
-        self.book = {}
-        self.load_brain(brain_file)
-    def load_brain(self, filename):
-        if os.path.exists(filename):
-            try:
-                with open(filename, "r", encoding="utf-8") as f: self.book = json.load(f)
-            except: self.book = {}
-    def get_book_move(self, board_fen):
-        base_fen = " ".join(board_fen.split(" ")[:4])
-        if base_fen in self.book:
-            try: return max(self.book[base_fen], key=self.book[base_fen].get)
-            except: return None
-        return None
-
-class ChessAI:
-    def __init__(self):
-        self.CHECKMATE = 10000; self.STALEMATE = 0
-        self.opening_book = OpeningBook()
-        self.piece_score = {"K": 0, "Q": 900, "R": 500, "B": 330, "N": 320, "P": 100}
-        self.nodes_visited = 0
-
-        # --- KONUM TABLOLARI (PST) ---
-        self.pawn_scores = [
-            [0,  0,  0,  0,  0,  0,  0,  0],
-            [50, 50, 50, 50, 50, 50, 50, 50],
-            [10, 10, 20, 30, 30, 20, 10, 10],
-            [5,  5, 10, 25, 25, 10,  5,  5],
-            [0,  0,  0, 20, 20,  0,  0,  0],
-            [5, -5,-10,  0,  0,-10, -5,  5],
-            [5, 10, 10,-20,-20, 10, 10,  5],
-            [0,  0,  0,  0,  0,  0,  0,  0]
-        ]
-        self.knight_scores = [
-            [-50,-40,-30,-30,-30,-30,-40,-50],
-            [-40,-20,  0,  0,  0,  0,-20,-40],
-            [-30,  0, 10, 15, 15, 10,  0,-30],
-            [-30,  5, 15, 20, 20, 15,  5,-30],
-            [-30,  0, 15, 20, 20, 15,  0,-30],
-            [-30,  5, 10, 15, 15, 10,  5,-30],
-            [-40,-20,  0,  5,  5,  0,-20,-40],
-            [-50,-40,-30,-30,-30,-30,-40,-50]
-        ]
-        self.bishop_scores = [
-            [-20,-10,-10,-10,-10,-10,-10,-20],
-            [-10,  0,  0,  0,  0,  0,  0,-10],
-            [-10,  0,  5, 10, 10,  5,  0,-10],
-            [-10,  5,  5, 10, 10,  5,  5,-10],
-            [-10,  0, 10, 10, 10, 10,  0,-10],
-            [-10, 10, 10, 10, 10, 10, 10,-10],
-            [-10,  5,  0,  0,  0,  0,  5,-10],
-            [-20,-10,-10,-10,-10,-10,-10,-20]
-        ]
-        self.rook_scores = [
-            [0,  0,  0,  0,  0,  0,  0,  0],
-            [5, 10, 10, 10, 10, 10, 10,  5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [-5,  0,  0,  0,  0,  0,  0, -5],
-            [0,  0,  0,  5,  5,  0,  0,  0]
-        ]
-        self.queen_scores = [
-            [-20,-10,-10, -5, -5,-10,-10,-20],
-            [-10,  0,  0,  0,  0,  0,  0,-10],
-            [-10,  0,  5,  5,  5,  5,  0,-10],
-            [-5,   0,  5,  5,  5,  5,  0, -5],
-            [0,    0,  5,  5,  5,  5,  0, -5],
-            [-10,  5,  5,  5,  5,  5,  0,-10],
-            [-10,  0,  5,  0,  0,  0,  0,-10],
-            [-20,-10,-10, -5, -5,-10,-10,-20]
-        ]
-        self.king_scores = [
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-30,-40,-40,-50,-50,-40,-40,-30],
-            [-20,-30,-30,-40,-40,-30,-30,-20],
-            [-10,-20,-20,-20,-20,-20,-20,-10],
-            [20, 20,  0,  0,  0,  0, 20, 20],
-            [20, 30, 10,  0,  0, 10, 30, 20]
-        ]
-        self.piece_position_scores = {"N": self.knight_scores, "B": self.bishop_scores, "Q": self.queen_scores, "R": self.rook_scores, "P": self.pawn_scores, "K": self.king_scores}
-
-    def find_best_move_smart(self, gs, valid_moves, time_limit, fixed_depth=None):
-        self.nodes_visited = 0
-        start_time = time.time()
-        
-        book_move = self.opening_book.get_book_move(gs.get_fen())
-        if book_move:
-            for m in valid_moves:
-                if m.get_uci() == book_move: return m, 0.0, 1, 1
-
-        best_global_move = None
-        best_global_score = -float('inf')
-        
-        random.shuffle(valid_moves)
-        valid_moves.sort(key=lambda m: (100 if m.piece_captured != "--" else 0), reverse=True)
-
-        current_depth = 1
-        history = [] 
-        max_search_depth = fixed_depth if fixed_depth else 20
-
-        while current_depth <= max_search_depth:
-            if time_limit and (time.time() - start_time > time_limit): break
-
-            try:
-                # OPTIMIZATION: Move Ordering
-                if best_global_move:
-                    valid_moves.sort(key=lambda m: m.move_id == best_global_move.move_id, reverse=True)
-
-                best_move_this_depth = None
-                best_score_this_depth = -float('inf')
-                alpha, beta = -self.CHECKMATE, self.CHECKMATE
-                
-                for move in valid_moves:
-                    gs.make_move(move)
-                    limit_check = time_limit if time_limit else 999999
-                    score = -self.minimax(gs, current_depth - 1, -beta, -alpha, 1, start_time, limit_check)
-                    gs.undo_move()
-                    
-                    if time_limit and (time.time() - start_time > time_limit): raise TimeoutError
-
-                    if score > best_score_this_depth:
-                        best_score_this_depth = score
-                        best_move_this_depth = move
-                    if score > alpha: alpha = score
-
-                best_global_move = best_move_this_depth
-                best_global_score = best_score_this_depth
-                history.append(best_global_move)
-                
-                print(f"🔎 Derinlik {current_depth}: {best_global_move.get_chess_notation()} ({best_global_score:.2f})")
-
-                if time_limit:
-                    if best_global_score > 9000: break
-                    if len(history) >= 4 and all(x == history[-1] for x in history[-4:]):
-                        if time.time() - start_time > (time_limit * 0.6):
-                            print("🚀 Hamle kararlı, erken kesiliyor.")
-                            break
-            except TimeoutError:
-                break 
-            current_depth += 1
-
-        if not best_global_move and valid_moves: best_global_move = valid_moves[0]
-        return best_global_move, best_global_score, self.nodes_visited, (current_depth - 1)
-
-    def minimax(self, gs, depth, alpha, beta, turn_multiplier, start_time, time_limit):
-        self.nodes_visited += 1
-        if self.nodes_visited % 1000 == 0:
-            if time.time() - start_time > time_limit: raise TimeoutError
-
-        if depth == 0: return turn_multiplier * self.score_board(gs)
-        
-        valid_moves = gs.get_valid_moves()
-        if not valid_moves: return -self.CHECKMATE + depth if gs.in_check() else self.STALEMATE
-
-        max_score = -self.CHECKMATE
-        for move in valid_moves:
-            gs.make_move(move)
-            score = -self.minimax(gs, depth - 1, -beta, -alpha, -turn_multiplier, start_time, time_limit)
-            gs.undo_move()
-            if score > max_score: max_score = score
-            if max_score > alpha: alpha = max_score
-            if alpha >= beta: break
-        return max_score
-
-    def score_board(self, gs):
-        if gs.checkmate: return -self.CHECKMATE if gs.white_to_move else self.CHECKMATE
-        if gs.stalemate: return self.STALEMATE
-        score = 0
-        for r in range(8):
-            for c in range(8):
-                piece = gs.board[r][c]
-                if piece != "--":
-                    piece_type = piece[1]; color = piece[0]
-                    material_value = self.piece_score[piece_type]
-                    if piece_type in self.piece_position_scores:
-                        position_table = self.piece_position_scores[piece_type]
-                        if color == 'w': position_value = position_table[r][c]
-                        else: position_value = position_table[7-r][c]
-                    else: position_value = 0
-
-                    if color == 'w': score += material_value + position_value
-                    else: score -= (material_value + position_value)
-        return score
-
-# ==========================================
-# 3. BÖLÜM: OYUN MOTORU
-# ==========================================
-class CastleRights:
-    def __init__(self, wks, wqs, bks, bqs):
-        self.wks = wks; self.wqs = wqs; self.bks = bks; self.bqs = bqs
-
-class GameState:
-    def __init__(self):
-        self.board = [
-            ["bR", "bN", "bB", "bQ", "bK", "bB", "bN", "bR"],
-            ["bP", "bP", "bP", "bP", "bP", "bP", "bP", "bP"],
-            ["--", "--", "--", "--", "--", "--", "--", "--"],
-            ["--", "--", "--", "--", "--", "--", "--", "--"],
-            ["--", "--", "--", "--", "--", "--", "--", "--"],
-            ["--", "--", "--", "--", "--", "--", "--", "--"],
-            ["wP", "wP", "wP", "wP", "wP", "wP", "wP", "wP"],
-            ["wR", "wN", "wB", "wQ", "wK", "wB", "wN", "wR"]
-        ]
-        self.white_to_move = True
-        self.move_log = []
-        self.white_king_location = (7, 4)
-        self.black_king_location = (0, 4)
-        self.checkmate = False; self.stalemate = False
-        self.current_castling_right = CastleRights(True, True, True, True)
-        self.castle_rights_log = [CastleRights(True, True, True, True)]
-
-    def clone(self):
-        return copy.deepcopy(self)
-
-    def generate_pgn(self):
-        pgn = ""; turn = 1
-        for i, move in enumerate(self.move_log):
-            if i % 2 == 0: pgn += f"{turn}. {move.get_chess_notation()} "
-            else: pgn += f"{move.get_chess_notation()} "; turn += 1
-        return pgn.strip()
-
-    def get_fen(self):
-        fen = ""; 
-        for r in range(8):
-            empty = 0
-            for c in range(8):
-                if self.board[r][c] == "--": empty += 1
-                else:
-                    if empty > 0: fen += str(empty); empty = 0
-                    color = self.board[r][c][0]; piece = self.board[r][c][1]
-                    fen += piece.upper() if color == 'w' else piece.lower()
-            if empty > 0: fen += str(empty)
-            if r < 7: fen += "/"
-        fen += " w " if self.white_to_move else " b "
-        fen += "KQkq - 0 1"
-        return fen
-
-    def count_pieces(self):
-        counts = {"wQ":0, "wR":0, "wB":0, "wN":0, "wP":0, "bQ":0, "bR":0, "bB":0, "bN":0, "bP":0}
-        for r in range(8):
-            for c in range(8):
-                p = self.board[r][c]
-                if p != "--" and p[1] != 'K': counts[p] += 1
-        return counts
-
-    def get_center_control(self):
-        center_sqs = [(4,3), (4,4), (3,3), (3,4)]
-        w_ctrl, b_ctrl = 0, 0
-        for r, c in center_sqs:
-            p = self.board[r][c]
-            if p[0] == 'w': w_ctrl += 1
-            elif p[0] == 'b': b_ctrl += 1
-        return w_ctrl, b_ctrl
-
-    def make_move(self, move):
-        self.board[move.start_row][move.start_col] = "--"
-        self.board[move.end_row][move.end_col] = move.piece_moved
-        if move.piece_moved == 'wP' and move.end_row == 0: self.board[move.end_row][move.end_col] = 'wQ'; move.is_pawn_promotion = True
-        elif move.piece_moved == 'bP' and move.end_row == 7: self.board[move.end_row][move.end_col] = 'bQ'; move.is_pawn_promotion = True
-        if move.is_castle_move:
-            if move.end_col - move.start_col == 2: 
-                self.board[move.end_row][move.end_col-1] = self.board[move.end_row][move.end_col+1]; self.board[move.end_row][move.end_col+1] = "--"
-            else: 
-                self.board[move.end_row][move.end_col+1] = self.board[move.end_row][move.end_col-2]; self.board[move.end_row][move.end_col-2] = "--"
-        self.move_log.append(move)
-        self.update_castle_rights(move)
-        self.castle_rights_log.append(CastleRights(self.current_castling_right.wks, self.current_castling_right.wqs, self.current_castling_right.bks, self.current_castling_right.bqs))
-        if move.piece_moved == 'wK': self.white_king_location = (move.end_row, move.end_col)
-        elif move.piece_moved == 'bK': self.black_king_location = (move.end_row, move.end_col)
-        self.white_to_move = not self.white_to_move
-
-    def undo_move(self):
-        if len(self.move_log) != 0:
-            move = self.move_log.pop()
-            self.board[move.start_row][move.start_col] = move.piece_moved
-            self.board[move.end_row][move.end_col] = move.piece_captured
-            self.white_to_move = not self.white_to_move
-            if move.piece_moved == 'wK': self.white_king_location = (move.start_row, move.start_col)
-            elif move.piece_moved == 'bK': self.black_king_location = (move.start_row, move.start_col)
-            if move.is_castle_move:
-                if move.end_col - move.start_col == 2:
-                    self.board[move.end_row][move.end_col+1] = self.board[move.end_row][move.end_col-1]; self.board[move.end_row][move.end_col-1] = "--"
-                else:
-                    self.board[move.end_row][move.end_col-2] = self.board[move.end_row][move.end_col+1]; self.board[move.end_row][move.end_col+1] = "--"
-            self.castle_rights_log.pop()
-            self.current_castling_right = copy.deepcopy(self.castle_rights_log[-1])
-            if move.is_pawn_promotion:
-                self.board[move.start_row][move.start_col] = move.piece_moved
-                self.board[move.end_row][move.end_col] = move.piece_captured
-            self.checkmate = False; self.stalemate = False
-
-    def update_castle_rights(self, move):
-        if move.piece_moved == 'wK': self.current_castling_right.wks = False; self.current_castling_right.wqs = False
-        elif move.piece_moved == 'bK': self.current_castling_right.bks = False; self.current_castling_right.bqs = False
-        elif move.piece_moved == 'wR':
-            if move.start_row == 7:
-                if move.start_col == 0: self.current_castling_right.wqs = False
-                elif move.start_col == 7: self.current_castling_right.wks = False
-        elif move.piece_moved == 'bR':
-            if move.start_row == 0:
-                if move.start_col == 0: self.current_castling_right.bqs = False
-                elif move.start_col == 7: self.current_castling_right.bks = False
-
-    def get_valid_moves(self):
-        temp_castle_rights = copy.deepcopy(self.current_castling_right)
-        moves = self.get_all_possible_moves()
-        if self.white_to_move: self.get_castle_moves(self.white_king_location[0], self.white_king_location[1], moves)
-        else: self.get_castle_moves(self.black_king_location[0], self.black_king_location[1], moves)
-        for i in range(len(moves) - 1, -1, -1):
-            self.make_move(moves[i])
-            self.white_to_move = not self.white_to_move 
-            if self.in_check(): moves.remove(moves[i])
-            self.white_to_move = not self.white_to_move 
-            self.undo_move()
-        if len(moves) == 0:
-            if self.in_check(): self.checkmate = True
-            else: self.stalemate = True
-        else: self.checkmate = False; self.stalemate = False
-        self.current_castling_right = temp_castle_rights
-        return moves
-
-    def in_check(self):
-        if self.white_to_move: return self.square_under_attack(self.white_king_location[0], self.white_king_location[1])
-        else: return self.square_under_attack(self.black_king_location[0], self.black_king_location[1])
-
-    def square_under_attack(self, r, c):
-        self.white_to_move = not self.white_to_move
-        opp_moves = self.get_all_possible_moves()
-        self.white_to_move = not self.white_to_move
-        for move in opp_moves:
-            if move.end_row == r and move.end_col == c: return True
-        return False
-
-    def get_all_possible_moves(self):
-        moves = []
-        for r in range(8):
-            for c in range(8):
-                turn = self.board[r][c][0]
-                if (turn == 'w' and self.white_to_move) or (turn == 'b' and not self.white_to_move):
-                    piece = self.board[r][c][1]
-                    if piece == 'P': self.get_pawn_moves(r, c, moves)
-                    elif piece == 'R': self.get_rook_moves(r, c, moves)
-                    elif piece == 'N': self.get_knight_moves(r, c, moves)
-                    elif piece == 'B': self.get_bishop_moves(r, c, moves)
-                    elif piece == 'Q': self.get_bishop_moves(r, c, moves); self.get_rook_moves(r, c, moves)
-                    elif piece == 'K': self.get_king_moves(r, c, moves)
-        return moves
-    
-    def get_pawn_moves(self, r, c, moves):
-        if self.white_to_move:
-            if self.board[r-1][c] == "--":
-                moves.append(Move((r, c), (r-1, c), self.board)); 
-                if r == 6 and self.board[r-2][c] == "--": moves.append(Move((r, c), (r-2, c), self.board))
-            if c-1 >= 0 and self.board[r-1][c-1][0] == 'b': moves.append(Move((r, c), (r-1, c-1), self.board))
-            if c+1 <= 7 and self.board[r-1][c+1][0] == 'b': moves.append(Move((r, c), (r-1, c+1), self.board))
-        else:
-            if r+1 < 8:
-                if self.board[r+1][c] == "--":
-                    moves.append(Move((r, c), (r+1, c), self.board)); 
-                    if r == 1 and self.board[r+2][c] == "--": moves.append(Move((r, c), (r+2, c), self.board))
-                if c-1 >= 0 and self.board[r+1][c-1][0] == 'w': moves.append(Move((r, c), (r+1, c-1), self.board))
-                if c+1 <= 7 and self.board[r+1][c+1][0] == 'w': moves.append(Move((r, c), (r+1, c+1), self.board))
-    def get_rook_moves(self, r, c, moves):
-        directions = [(-1, 0), (0, -1), (1, 0), (0, 1)]
-        enemy = "b" if self.white_to_move else "w"
-        for d in directions:
-            for i in range(1, 8):
-                er, ec = r + d[0] * i, c + d[1] * i
-                if 0 <= er < 8 and 0 <= ec < 8:
-                    p = self.board[er][ec]
-                    if p == "--": moves.append(Move((r, c), (er, ec), self.board))
-                    elif p[0] == enemy: moves.append(Move((r, c), (er, ec), self.board)); break
-                    else: break
-                else: break
-    def get_knight_moves(self, r, c, moves):
-        km = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
-        enemy = "b" if self.white_to_move else "w"
-        for m in km:
-            er, ec = r + m[0], c + m[1]
-            if 0 <= er < 8 and 0 <= ec < 8:
-                p = self.board[er][ec]
-                if p == "--" or p[0] == enemy: moves.append(Move((r, c), (er, ec), self.board))
-    def get_bishop_moves(self, r, c, moves):
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        enemy = "b" if self.white_to_move else "w"
-        for d in directions:
-            for i in range(1, 8):
-                er, ec = r + d[0] * i, c + d[1] * i
-                if 0 <= er < 8 and 0 <= ec < 8:
-                    p = self.board[er][ec]
-                    if p == "--": moves.append(Move((r, c), (er, ec), self.board))
-                    elif p[0] == enemy: moves.append(Move((r, c), (er, ec), self.board)); break
-                    else: break
-                else: break
-    def get_king_moves(self, r, c, moves):
-        km = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        enemy = "b" if self.white_to_move else "w"
-        for m in km:
-            er, ec = r + m[0], c + m[1]
-            if 0 <= er < 8 and 0 <= ec < 8:
-                p = self.board[er][ec]
-                if p == "--" or p[0] == enemy: moves.append(Move((r, c), (er, ec), self.board))
-    def get_castle_moves(self, r, c, moves):
-        if self.square_under_attack(r, c): return
-        if (self.white_to_move and self.current_castling_right.wks) or (not self.white_to_move and self.current_castling_right.bks):
-            if self.board[r][c+1] == '--' and self.board[r][c+2] == '--':
-                if not self.square_under_attack(r, c+1) and not self.square_under_attack(r, c+2):
-                    moves.append(Move((r, c), (r, c+2), self.board, is_castle=True))
-        if (self.white_to_move and self.current_castling_right.wqs) or (not self.white_to_move and self.current_castling_right.bqs):
-            if self.board[r][c-1] == '--' and self.board[r][c-2] == '--' and self.board[r][c-3] == '--':
-                if not self.square_under_attack(r, c-1) and not self.square_under_attack(r, c-2):
-                    moves.append(Move((r, c), (r, c-2), self.board, is_castle=True))
-
-class Move:
-    def __init__(self, start_sq, end_sq, board, is_castle=False):
-        self.start_row = start_sq[0]; self.start_col = start_sq[1]
-        self.end_row = end_sq[0]; self.end_col = end_sq[1]
-        self.piece_moved = board[self.start_row][self.start_col]
-        self.piece_captured = board[self.end_row][self.end_col]
-        self.is_pawn_promotion = False
-        self.is_castle_move = is_castle
-        self.move_id = self.start_row * 1000 + self.start_col * 100 + self.end_row * 10 + self.end_col
-    def __eq__(self, other): return isinstance(other, Move) and self.move_id == other.move_id
-    def get_chess_notation(self): return self.get_rank_file(self.start_row, self.start_col) + self.get_rank_file(self.end_row, self.end_col)
-    def get_rank_file(self, r, c):
-        cols = {0:'a', 1:'b', 2:'c', 3:'d', 4:'e', 5:'f', 6:'g', 7:'h'}
-        rows = {0:'8', 1:'7', 2:'6', 3:'5', 4:'4', 5:'3', 6:'2', 7:'1'}
-        return cols[c] + rows[r]
-    def get_uci(self): return self.get_rank_file(self.start_row, self.start_col) + self.get_rank_file(self.end_row, self.end_col)
-
-# ==========================================
-# 4. BÖLÜM: ARAYÜZ
+# 2. BÖLÜM: ARAYÜZ
 # ==========================================
 class PGNDialog(QDialog):
     def __init__(self, pgn_text, parent=None):
@@ -568,7 +133,7 @@ class BoardWidget(QWidget):
                 painter.fillRect(c * self.sq_size, r * self.sq_size, self.sq_size, self.sq_size, color)
                 if self.selected_sq == (c, r): painter.fillRect(c * self.sq_size, r * self.sq_size, self.sq_size, self.sq_size, QColor(0, 255, 255, 100))
         if len(self.gs.move_log) > 0:
-            last = self.gs.move_log[-1]
+            last = Move.from_code(self.gs.move_log[-1], self.gs.board)
             painter.fillRect(last.start_col * self.sq_size, last.start_row * self.sq_size, self.sq_size, self.sq_size, QColor(255, 255, 0, 100))
             painter.fillRect(last.end_col * self.sq_size, last.end_row * self.sq_size, self.sq_size, self.sq_size, QColor(255, 255, 0, 100))
         self.draw_hints(painter)
@@ -644,6 +209,11 @@ class SatrancAnaliz(QWidget):
         self.gs = GameState(); self.ai = ChessAI()
         self.valid_moves = self.gs.get_valid_moves()
         self.worker = None; self.last_nodes = 0; self.bot_thinking = False
+        self.draw_reason = None  # kural gereği beraberlik (50 hamle, üçlü tekrar, yetersiz materyal)
+        # Ponder: botun rakibin süresinde tahmin edilen cevabı araması. Ayrı ChessAI ile yapılır (yalnızca TT ortak),
+        # böylece arayüz istatistikleri (score_board -> piyon tablosu) ponder sürerken aranan nesneye dokunmaz.
+        self.ponder_ai = ChessAI(); self.ponder_ai.tt = self.ai.tt
+        self.ponder_worker = None; self.ponder_move = None; self.ponder_result = None; self.ponder_hit = False
         
         self.total_time = time_limit; self.increment = increment; self.game_mode = game_mode
         self.white_time = time_limit if time_limit else 0; self.black_time = time_limit if time_limit else 0
@@ -676,6 +246,9 @@ class SatrancAnaliz(QWidget):
         
         self.lbl_status = QLabel("Oyun Başladı! Sıra Beyazda."); self.lbl_status.setStyleSheet("color: #aaa; font-style: italic; margin-top: 10px;")
         l_lay.addWidget(self.lbl_status)
+        if self.game_mode == "PvE":
+            self.chk_ponder = QCheckBox("Rakibin süresinde düşün (Ponder)"); self.chk_ponder.setChecked(True)
+            l_lay.addWidget(self.chk_ponder)
         
         if not self.is_timed:
             depth_frame = QFrame(); depth_frame.setStyleSheet("background: #444; border-radius: 5px; margin-top: 10px;")
@@ -687,6 +260,11 @@ class SatrancAnaliz(QWidget):
             self.spin_depth.setStyleSheet("background: #555; color: white; padding: 5px;")
             spin_layout.addWidget(QLabel("Derinlik:")); spin_layout.addWidget(self.spin_depth)
             df_layout.addLayout(spin_layout)
+            workers_layout = QHBoxLayout()
+            self.spin_workers = QSpinBox(); self.spin_workers.setRange(1, os.cpu_count() or 1); self.spin_workers.setValue(1)
+            self.spin_workers.setStyleSheet("background: #555; color: white; padding: 5px;")
+            workers_layout.addWidget(QLabel("İşlemci Çekirdeği:")); workers_layout.addWidget(self.spin_workers)
+            df_layout.addLayout(workers_layout)
             l_lay.addWidget(depth_frame)
 
         main_layout.addWidget(left, 3)
@@ -723,7 +301,7 @@ class SatrancAnaliz(QWidget):
         self.setLayout(main_layout); self.update_stats()
 
     def update_clock(self):
-        if not self.is_timed or self.gs.checkmate or self.gs.stalemate: return
+        if not self.is_timed or self.game_finished(): return
         if self.gs.white_to_move:
             self.white_time -= 1
             if self.white_time <= 0: self.game_over("Süre Bitti! Siyah Kazandı.")
@@ -738,7 +316,7 @@ class SatrancAnaliz(QWidget):
         bm, bs = divmod(self.black_time, 60); self.lcd_black.display(f"{bm:02}:{bs:02}")
 
     def game_over(self, msg):
-        self.timer.stop()
+        self.timer.stop(); self.stop_ponder()
         QMessageBox.information(self, "Oyun Bitti", msg)
         
         reply = QMessageBox.question(self, "Analiz", "Bu oyunu analiz etmek için PGN kodunu almak ister misin?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
@@ -752,6 +330,7 @@ class SatrancAnaliz(QWidget):
 
     def reset_game(self):
         # İşçiyi durdurma
+        self.stop_ponder()
         if self.worker and self.worker.isRunning(): self.worker.terminate()
         
         # Oyun Durumunu Sıfırlama
@@ -759,6 +338,7 @@ class SatrancAnaliz(QWidget):
         self.valid_moves = self.gs.get_valid_moves()
         self.bot_thinking = False
         self.last_nodes = 0
+        self.draw_reason = None  # önceki oyunun kural beraberliği saati dondurmasın
         
         # Zamanı Sıfırlama
         if self.is_timed:
@@ -800,7 +380,7 @@ class SatrancAnaliz(QWidget):
                         else: self.black_time += self.increment
                     self.board.selected_sq = (); self.player_clicks = []
                     self.refresh(); self.display_time()
-                    if not self.gs.checkmate and not self.gs.stalemate:
+                    if not self.game_finished():
                         if self.game_mode == "PvE" and not self.gs.white_to_move: self.start_bot_turn()
                 else:
                     self.player_clicks = [(c, r)]; self.board.selected_sq = (c, r); self.board.update()
@@ -808,17 +388,39 @@ class SatrancAnaliz(QWidget):
     def start_bot_turn(self):
         self.bot_thinking = True
         self.lbl_status.setText("Bot Düşünüyor..."); self.lbl_status.setStyleSheet("color: yellow")
+        if self.ponder_worker is not None and self.gs.move_log[-1] == self.ponder_move:
+            # Tahmin tuttu: ısınmış arama devam eder, yalnızca süre sınırı eklenir. Ponder motoru ana motor olur
+            # (sonraki ponder tahmini onun ana varyantından gelir), eski ana motor bir sonraki ponder için kullanılır.
+            self.ponder_hit = True
+            self.ai, self.ponder_ai = self.ponder_ai, self.ai
+            self.ponder_worker.iteration.connect(self.handle_iteration)
+            if self.ponder_result is not None: self.ponder_worker = None; self.handle_bot_result(*self.ponder_result)
+            elif self.is_timed:
+                worker = self.ponder_worker; ai = self.ai
+                QTimer.singleShot(int(ai.think_time(self.black_time, self.increment) * 1000), lambda: self.ponder_worker is worker and setattr(ai, 'stop_requested', True))
+            return
+        self.stop_ponder()
         if self.is_timed:
-            think_time = max(0.5, min(15.0, (self.black_time * 0.05) + self.increment))
+            think_time = self.ai.think_time(self.black_time, self.increment)
             fixed_depth = None
         else:
             think_time = None
             fixed_depth = self.spin_depth.value()
-        gs_clone = self.gs.clone() 
+            self.ai.search_workers = self.spin_workers.value()
+            self.ai.parallel_search = self.ai.search_workers > 1
+        self.ai.stop_requested = False
+        gs_clone = self.gs.snapshot()
         self.worker = BotWorker(self.ai, gs_clone, self.valid_moves, think_time, fixed_depth)
         self.worker.finished.connect(self.handle_bot_result)
+        self.worker.iteration.connect(self.handle_iteration)
         self.worker.start()
 
+    def handle_iteration(self, entry):
+        # Arama sürerken derinlik, düğüm ve hız canlı gösterilir
+        self.stats_tbl.setItem(8, 1, QTableWidgetItem(f"{entry['nodes']:,}".replace(",", ".")))
+        self.stats_tbl.setItem(9, 1, QTableWidgetItem(str(entry['depth'])))
+        self.lbl_status.setText(f"Bot Düşünüyor... Derinlik {entry['depth']}: {' '.join(entry['pv'][:5])} ({entry['nps']:,} düğüm/s)".replace(",", "."))
+
     def handle_bot_result(self, best_move, score, nodes, max_depth):
         self.bot_thinking = False
         if best_move:
@@ -829,15 +431,48 @@ class SatrancAnaliz(QWidget):
             self.board.arrows = []
             self.refresh(); self.display_time()
             self.lbl_status.setText("Sıra Beyazda."); self.lbl_status.setStyleSheet("color: #0f0")
+            if not self.game_finished(): self.start_ponder()
+
+    def start_ponder(self):
+        # Beklenen cevap TT'den alınır; o hamleden sonraki konum arka planda, süre sınırı olmadan aranır.
+        # Paralel aramada durdurma bayrağı işçi süreçlerine ulaşmadığı için ponder yapılmaz.
+        self.ponder_worker = None; self.ponder_move = None; self.ponder_result = None; self.ponder_hit = False
+        if self.game_mode != "PvE" or not self.chk_ponder.isChecked() or self.ai.parallel_search: return
+        predicted = self.ai.get_ponder_move(self.gs)
+        if predicted is None: return
+        gs_ponder = self.gs.snapshot(); gs_ponder.make_move(predicted)
+        valid_moves = gs_ponder.get_valid_moves()
+        if not valid_moves: return
+        self.ponder_move = predicted
+        self.ponder_ai.stop_requested = False
+        self.ponder_worker = BotWorker(self.ponder_ai, gs_ponder, valid_moves, None, None if self.is_timed else self.spin_depth.value())
+        self.ponder_worker.finished.connect(self.handle_ponder_result)
+        self.ponder_worker.start()
+
+    def handle_ponder_result(self, best_move, score, nodes, max_depth):
+        if self.ponder_hit: self.ponder_worker = None; self.handle_bot_result(best_move, score, nodes, max_depth)
+        else: self.ponder_result = (best_move, score, nodes, max_depth)  # tahmin henüz doğrulanmadı
+
+    def stop_ponder(self):
+        # Tahmin tutmadı (ya da oyun değişti): arama temiz biçimde durdurulur, sonucu atılır
+        if self.ponder_worker is not None:
+            self.ponder_worker.finished.disconnect()
+            if self.ponder_worker.isRunning(): self.ponder_worker.ai.stop_requested = True; self.ponder_worker.wait()
+        self.ponder_worker = None; self.ponder_move = None; self.ponder_result = None; self.ponder_hit = False
 
     def refresh(self):
         self.valid_moves = self.gs.get_valid_moves(); self.board.valid_moves = self.valid_moves
+        self.draw_reason = self.gs.draw_by_rule()
         self.update_stats(); self.board.update()
-        if self.gs.checkmate or self.gs.stalemate:
+        if self.game_finished():
             self.timer.stop()
             msg = "Kazandınız!" if (self.gs.checkmate and not self.gs.white_to_move) else "Kaybettiniz!" if self.gs.checkmate else "Berabere!"
+            if self.draw_reason and not self.gs.checkmate and not self.gs.stalemate: msg += f" ({self.draw_reason})"
             self.game_over(msg)
 
+    def game_finished(self):
+        return self.gs.checkmate or self.gs.stalemate or self.draw_reason is not None
+
     def add_to_table(self, m, p):
         t = m.get_chess_notation(); t += "+" if self.gs.in_check() else ""
         row = self.move_table.rowCount()
@@ -847,6 +482,7 @@ class SatrancAnaliz(QWidget):
 
     def undo_move(self):
         if self.bot_thinking: return
+        self.stop_ponder()
         if self.game_mode == "PvE":
             if len(self.gs.move_log) >= 2:
                 self.gs.undo_move(); self.gs.undo_move()
@@ -883,6 +519,7 @@ class SatrancAnaliz(QWidget):
         status = "Oynanıyor"
         if self.gs.checkmate: status = "MAT Bitti"
         elif self.gs.stalemate: status = "PAT"
+        elif self.gs.draw_by_rule(): status = "BERABERE"
         self.stats_tbl.setItem(12, 1, QTableWidgetItem(status))
         try: wp = 1 / (1 + 10 ** (-sc / 1000)) * 100
         except: wp = 100 if sc > 0 else 0
@@ -891,7 +528,11 @@ class SatrancAnaliz(QWidget):
     def keyPressEvent(self, e):
         if e.key() == Qt.Key.Key_Z: self.undo_move()
 
+    def closeEvent(self, e):
+        self.stop_ponder(); super().closeEvent(e)
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # PyInstaller ile paketlenmiş exe'de işçi süreçleri için
     app = QApplication(sys.argv)
     dialog = StartDialog()
     if dialog.exec():
@@ -0,0 +1,36 @@
+﻿import sys
+import json
+import time
+import argparse
+from satranc_motoru import GameState, BOOK_FILE, encode_book_move, write_book
+
+# ==========================================
+# AÇILIŞ KİTABI DÖNÜŞTÜRÜCÜ: beyin.json -> beyin.bin
+# ==========================================
+# JSON biçimi: {"<FEN>": {"<uci hamle>": sayı, ...}, ...}
+# Kullanım: python kitap_donustur.py beyin.json beyin.bin
+
+def convert(json_file, book_file):
+    with open(json_file, "r", encoding="utf-8") as f: book = json.load(f)
+    entries = []; skipped = 0; gs = GameState()
+    for fen, moves in book.items():
+        try: key = gs.load_fen(fen).book_key()
+        except ValueError: skipped += 1; continue
+        for uci, weight in moves.items():
+            try: entries.append((key, encode_book_move(uci), int(weight)))
+            except (ValueError, IndexError): skipped += 1
+    return write_book(entries, book_file), len(book), skipped
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON açılış kitabını mmap ile okunan ikili biçime dönüştürür.")
+    parser.add_argument("json_file", nargs="?", default="beyin.json")
+    parser.add_argument("book_file", nargs="?", default=BOOK_FILE)
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    count, positions, skipped = convert(args.json_file, args.book_file)
+    print(f"✅ {positions} konum, {count} kayıt -> {args.book_file} ({time.perf_counter() - start:.2f}s)")
+    if skipped: print(f"⚠️ {skipped} geçersiz konum/hamle atlandı.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
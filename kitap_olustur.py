@@ -0,0 +1,190 @@
+﻿import os
+import re
+import sys
+import time
+import heapq
+import argparse
+import tempfile
+from itertools import groupby
+from collections import deque
+from satranc_motoru import BitboardGameState, BOOK_FILE, BOOK_MAGIC, BOOK_HEADER, BOOK_ENTRY, MOVE_CASTLE, PROMOTION_PIECES, SQUARE_NAMES
+
+# ==========================================
+# AÇILIŞ KİTABI OLUŞTURUCU: PGN ARŞİVİ -> beyin.bin
+# ==========================================
+# Eşle-indirge: ana süreç PGN dosyalarını akış halinde okuyup oyunları paketler halinde süreç havuzuna verir;
+# işçiler her oyunun ilk N yarım hamlesini GameState ile oynatıp (konum anahtarı, hamle) sayılarını döndürür.
+# Ana süreç sayıları birleştirir; kayıt sayısı sınırı aşılınca sıralı parça geçici dosyaya yazılır ve sonunda
+# parçalar sıralı birleştirilir. Bellek oyun sayısından bağımsızdır. Çıktı OpeningBook'un mmap biçimidir.
+# Kullanım:
+#   python kitap_olustur.py oyunlar.pgn -o beyin.bin --plies 16 --min-count 3 --min-frequency 0.05 --workers 4
+
+SQUARE_INDEX = {name: i for i, name in enumerate(SQUARE_NAMES)}
+COMMENT_RE = re.compile(r"\{[^}]*\}")
+VARIATION_RE = re.compile(r"\([^()]*\)")
+NOISE_RE = re.compile(r"\$\d+|\d+\.(?:\.\.)?|1-0|0-1|1/2-1/2|\*")
+
+def read_games(stream):
+    # (FEN ya da None, hamle metni); başlıklar yalnızca başlangıç konumu için okunur, ';' ve '%' yorumları atlanır
+    fen = None; moves = []
+    for line in stream:
+        line = line.strip()
+        if line.startswith("["):
+            if moves: yield fen, " ".join(moves); fen = None; moves = []
+            if line.startswith("[FEN "): fen = line[5:].strip('"]')
+        elif line and not line.startswith("%"):
+            moves.append(line.split(";", 1)[0])
+    if moves: yield fen, " ".join(moves)
+
+def san_tokens(movetext):
+    # Yorumlar, (iç içe) varyantlar, NAG'ler, hamle numaraları ve sonuç çıkarılır
+    text = COMMENT_RE.sub(" ", movetext)
+    while "(" in text:
+        stripped = VARIATION_RE.sub(" ", text)
+        if stripped == text: break
+        text = stripped
+    return NOISE_RE.sub(" ", text).split()
+
+def resolve_san(gs, token, codes):
+    # Hızlı yol: taş türü, hedef kare, terfi ve ayırt edici harf/rakamla süzme; tek aday kalmazsa GameState.parse_san
+    text = token.rstrip("+#!?")
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        target_col = 2 if len(text) == 5 else 6
+        return next((c for c in codes if (c >> 12) & 7 == MOVE_CASTLE and (c >> 6) & 7 == target_col), None)
+    piece = text[0] if text[:1] in ("N", "B", "R", "Q", "K") else "P"
+    body = (text[1:] if piece != "P" else text).replace("x", "").replace("-", "").replace("=", "")
+    promotion = 0
+    if piece == "P" and body[-1:] in ("N", "B", "R", "Q"): promotion = PROMOTION_PIECES.index(body[-1]); body = body[:-1]
+    end = SQUARE_INDEX.get(body[-2:]); hint = body[:-2]
+    if end is not None:
+        board = gs.board
+        matches = [c for c in codes if (c >> 6) & 63 == end and c >> 15 == promotion and board[(c & 63) >> 3][c & 7][1] == piece
+                   and all(ch in SQUARE_NAMES[c & 63] for ch in hint)]
+        if len(matches) == 1: return matches[0]
+    return gs.parse_san(token, codes)
+
+def count_games(games, plies):
+    # İşçi (eşle): oyun paketi -> ({anahtar << 16 | kitap hamlesi: sayı}, oynatılan oyun, yarıda kalan oyun)
+    counts = {}; played = 0; broken = 0
+    for fen, movetext in games:
+        try: gs = BitboardGameState().load_fen(fen) if fen else BitboardGameState()
+        except ValueError: broken += 1; continue
+        for token in san_tokens(movetext)[:plies]:
+            codes = gs.get_valid_move_codes()
+            code = resolve_san(gs, token, codes)
+            if code is None: broken += 1; break
+            packed = gs.book_key() << 16 | code & 4095 | (code >> 15) << 12  # OpeningBook hamle kodlaması
+            counts[packed] = counts.get(packed, 0) + 1
+            gs.make_move(code)
+        played += 1
+    return counts, played, broken
+
+def write_run(counts, directory, number):
+    # Sıralı parça: (anahtar, hamle, sayı) kayıtları, kitap kaydıyla aynı biçimde
+    filename = os.path.join(directory, f"parca{number:04d}.bin")
+    with open(filename, "wb") as f:
+        f.write(b"".join(BOOK_ENTRY.pack(packed >> 16, packed & 0xFFFF, min(count, 0xFFFFFFFF)) for packed, count in sorted(counts.items())))
+    return filename
+
+def read_run(filename):
+    with open(filename, "rb") as f:
+        while True:
+            data = f.read(BOOK_ENTRY.size * 4096)
+            if not data: return
+            for key, move, count in BOOK_ENTRY.iter_unpack(data): yield key << 16 | move, count
+
+def merge_runs(streams):
+    # İndirge: sıralı akışlar birleştirilir, aynı anahtar + hamle sayıları toplanır
+    current = None; total = 0
+    for packed, count in heapq.merge(*streams):
+        if packed != current:
+            if current is not None: yield current, total
+            current = packed; total = 0
+        total += count
+    if current is not None: yield current, total
+
+def write_filtered_book(counts, book_file, min_count, min_frequency):
+    # Konum başına filtre: hamle en az min_count kez ve konumdaki oyunların en az min_frequency oranında oynanmış olmalı.
+    # Kayıtlar akış halinde yazılır, sayı başlığa en sonda işlenir; dosya geçici adla yazılıp yerine taşınır.
+    temp_file = book_file + ".tmp"; written = 0; positions = 0
+    with open(temp_file, "wb") as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, 0))
+        for key, group in groupby(counts, key=lambda item: item[0] >> 16):
+            moves = list(group); total = sum(count for _, count in moves)
+            kept = [(packed & 0xFFFF, count) for packed, count in moves if count >= min_count and count >= min_frequency * total]
+            if kept: positions += 1
+            for move, count in kept: f.write(BOOK_ENTRY.pack(key, move, min(count, 0xFFFFFFFF))); written += 1
+        f.seek(0); f.write(BOOK_HEADER.pack(BOOK_MAGIC, written))
+    os.replace(temp_file, book_file)
+    return written, positions
+
+def build_book(pgn_files, book_file, plies=16, workers=1, min_count=1, min_frequency=0.0, batch_size=500, max_entries=2000000, on_progress=None):
+    # Dönüş: (oynatılan oyun, yarıda kalan oyun, yazılan kayıt, kitaptaki konum)
+    def batches():
+        batch = []
+        for filename in pgn_files:
+            with open(filename, "r", encoding="utf-8", errors="replace") as f:
+                for game in read_games(f):
+                    batch.append(game)
+                    if len(batch) == batch_size: yield batch; batch = []
+        if batch: yield batch
+    merged = {}; played = broken = 0
+    with tempfile.TemporaryDirectory(prefix="kitap_") as run_dir:
+        runs = []
+        def reduce(result):
+            nonlocal merged, played, broken
+            counts, done, failed = result
+            played += done; broken += failed
+            for packed, count in counts.items(): merged[packed] = merged.get(packed, 0) + count
+            if len(merged) > max_entries: runs.append(write_run(merged, run_dir, len(runs))); merged = {}
+            if on_progress: on_progress(played, broken, len(merged), len(runs))
+        if workers <= 1:
+            for batch in batches(): reduce(count_games(batch, plies))
+        else:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                pending = deque()
+                for batch in batches():
+                    pending.append(pool.submit(count_games, batch, plies))
+                    while len(pending) >= 2 * workers:  # en fazla 2 * workers paket bellekte
+                        finished = wait(pending, return_when=FIRST_COMPLETED).done
+                        pending = deque(f for f in pending if f not in finished)
+                        for future in finished: reduce(future.result())
+                for future in pending: reduce(future.result())
+        if runs:
+            if merged: runs.append(write_run(merged, run_dir, len(runs))); merged = {}
+            counts = merge_runs([read_run(run) for run in runs])
+        else: counts = sorted(merged.items())
+        written, positions = write_filtered_book(counts, book_file, min_count, min_frequency)
+    return played, broken, written, positions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PGN arşivlerinden paralel olarak OpeningBook biçiminde (beyin.bin) açılış kitabı üretir.")
+    parser.add_argument("pgn_files", nargs="+", help="PGN dosyaları")
+    parser.add_argument("-o", "--output", default=BOOK_FILE, help="Kitap dosyası (varsayılan: motorun okuduğu beyin.bin)")
+    parser.add_argument("--plies", type=int, default=16, help="Oyun başına kullanılan ilk yarım hamle sayısı")
+    parser.add_argument("--min-count", type=int, default=2, help="Bir hamlenin kitaba girmesi için en az oynanma sayısı")
+    parser.add_argument("--min-frequency", type=float, default=0.0, help="Hamlenin konumdaki oyunlar içindeki en düşük oranı (0-1)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="İşçi süreç sayısı")
+    parser.add_argument("--batch-size", type=int, default=500, help="İşçiye tek seferde gönderilen oyun sayısı")
+    parser.add_argument("--max-entries", type=int, default=2000000, help="Bellekte tutulan en fazla kayıt; aşılınca diske sıralı parça yazılır")
+    args = parser.parse_args(argv)
+    missing = [f for f in args.pgn_files if not os.path.exists(f)]
+    if missing: parser.error("Dosya bulunamadı: " + ", ".join(missing))
+    start = time.perf_counter(); last_report = [start]
+
+    def report(played, broken, entries, runs):
+        now = time.perf_counter()
+        if now - last_report[0] < 5: return
+        last_report[0] = now
+        print(f"⏳ {played:,} oyun ({played / (now - start):,.0f} oyun/s), bellekte {entries:,} kayıt, {runs} parça", file=sys.stderr)
+    played, broken, written, positions = build_book(args.pgn_files, args.output, args.plies, max(1, args.workers), args.min_count,
+                                                     args.min_frequency, max(1, args.batch_size), max(1, args.max_entries), report)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {played:,} oyun, {positions:,} konum, {written:,} kayıt -> {args.output} ({elapsed:.1f}s, {played / elapsed if elapsed else 0:,.0f} oyun/s)")
+    if broken: print(f"⚠️ {broken:,} oyun geçersiz hamle ya da FEN nedeniyle yarıda kesildi.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
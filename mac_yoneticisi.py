@@ -0,0 +1,181 @@
+﻿import os
+import sys
+import math
+import time
+import argparse
+from satranc_motoru import ChessAI, GameState, OpeningBook, BACKENDS
+
+# ==========================================
+# MAÇ YÖNETİCİSİ: ARAYÜZSÜZ KENDİ KENDİNE OYUN
+# ==========================================
+# İki motor ayarı (A ve B) arasında N oyun; oyunlar süreç havuzunda paralel oynanır.
+# Ayar: virgülle ayrılmış anahtar=değer; depth ve time (hamle başına saniye) dışındaki anahtarlar ChessAI niteliğidir.
+# Kullanım:
+#   python mac_yoneticisi.py --games 40 --a "depth=4" --b "depth=4,use_lmr=false" --openings acilislar.txt --pgn mac.pgn
+#   python mac_yoneticisi.py --games 20 --a "time=0.5" --b "time=0.5,aspiration_window=0" --workers 4 --backend bitboard
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+SEARCH_KEYS = ("depth", "time", "book")
+
+def parse_value(text):
+    lowered = text.strip().lower()
+    if lowered in ("true", "false"): return lowered == "true"
+    for cast in (int, float):
+        try: return cast(text)
+        except ValueError: pass
+    return text.strip()
+
+def parse_engine(spec):
+    # "depth=4,use_lmr=false" -> {"depth": 4, "use_lmr": False}; bilinmeyen anahtar ya da geçersiz değer ValueError
+    config = {}; ai = ChessAI()
+    attributes = set(vars(ai)) | {name for name, value in vars(ChessAI).items() if isinstance(value, property)}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        if "=" not in item: raise ValueError(f"Geçersiz ayar: {item}")
+        key, value = (part.strip() for part in item.split("=", 1))
+        if key not in SEARCH_KEYS and key not in attributes: raise ValueError(f"Bilinmeyen ayar: {key}")
+        config[key] = parse_value(value)
+        if key not in SEARCH_KEYS: setattr(ai, key, config[key])  # doğrulanan ayarlar (ör. lmr_min_depth) burada hata verir
+    if not config.get("depth") and not config.get("time"): raise ValueError(f"depth ya da time gerekli: {spec}")
+    return config
+
+def load_openings(filename):
+    # Satır başına bir FEN; EPD satırlarında ilk dört alan kullanılır. Boş ve '#' satırları atlanır.
+    if not filename: return [START_FEN]
+    openings = []
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            fields = line.split(";")[0].split()
+            fen = " ".join(fields[:6]) if len(fields) >= 6 and fields[4].isdigit() else " ".join(fields[:4])
+            GameState().load_fen(fen)  # geçersiz FEN erken hata verir
+            openings.append(fen)
+    if not openings: raise ValueError(f"Açılış bulunamadı: {filename}")
+    return openings
+
+def make_engine(config):
+    ai = ChessAI(); ai.verbose = False
+    if not config.get("book", False): ai.opening_book.close(); ai.opening_book = OpeningBook("")  # açılışlar dosyadan gelir
+    for key, value in config.items():
+        if key not in SEARCH_KEYS: setattr(ai, key, value)
+    return ai
+
+def san_movetext(sans, first_ply):
+    # PGN hamle metni (SAN); numaralandırma FEN'deki tam hamle numarasından başlar, siyahla başlayan kayıt "N..." ile açılır
+    parts = []
+    for i, san in enumerate(sans):
+        ply = first_ply + i
+        if ply % 2 == 0: parts.append(f"{ply // 2 + 1}. {san}")
+        elif i == 0: parts.append(f"{ply // 2 + 1}... {san}")
+        else: parts.append(san)
+    return " ".join(parts)
+
+def play_game(index, fen, config_a, config_b, a_white, max_plies, backend="mailbox"):
+    # Tek oyun: A beyazsa a_white; iki motor da backend gösterimindeki aynı konumda arar. Dönüş: sonuç, neden, PGN ve taraf başına düğüm/süre toplamları.
+    engines = {True: make_engine(config_a if a_white else config_b), False: make_engine(config_b if a_white else config_a)}
+    configs = {True: config_a if a_white else config_b, False: config_b if a_white else config_a}
+    gs = BACKENDS[backend]().load_fen(fen)
+    nodes = {True: 0, False: 0}; elapsed = {True: 0.0, False: 0.0}; sans = []; first_ply = gs.ply_offset
+    result = reason = None
+    while result is None:
+        valid_moves = gs.get_valid_moves()
+        if not valid_moves:
+            if gs.checkmate: result = "0-1" if gs.white_to_move else "1-0"; reason = "mat"
+            else: result = "1/2-1/2"; reason = "pat"
+            break
+        reason = gs.draw_by_rule()
+        if reason is None and len(gs.move_log) >= max_plies: reason = "hamle sınırı"
+        if reason is not None: result = "1/2-1/2"; break
+        side = gs.white_to_move; config = configs[side]
+        start = time.perf_counter()
+        move, score, searched, depth = engines[side].find_best_move_smart(gs, valid_moves, config.get("time"), config.get("depth"))
+        elapsed[side] += time.perf_counter() - start; nodes[side] += searched
+        sans.append(gs.get_san(move.move_id, [m.move_id for m in valid_moves]))
+        gs.make_move(move)
+    for ai in engines.values(): ai.close_pool()
+    return {"index": index, "fen": fen, "a_white": a_white, "result": result, "reason": reason, "moves": san_movetext(sans, first_ply),
+            "plies": len(gs.move_log), "nodes": (nodes[a_white], nodes[not a_white]), "time": (elapsed[a_white], elapsed[not a_white])}
+
+def elo_difference(wins, draws, losses):
+    # Puan oranından Elo farkı ve oyun başı puanın standart hatasıyla %95 güven aralığı (alt, üst).
+    # Bütün oyunlar aynı sonuçla biterse varyans sıfırdır; aralık tanımsızdır (None, None)
+    games = wins + draws + losses
+    if games == 0: return 0.0, None, None
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    if variance == 0: return 0.0 if score == 0.5 else (float('inf') if score == 1 else -float('inf')), None, None
+    margin = 1.96 * math.sqrt(variance / games)
+    def to_elo(p):
+        if p <= 0: return -float('inf')
+        if p >= 1: return float('inf')
+        return -400 * math.log10(1 / p - 1) + 0.0  # -0.0 yerine 0.0
+    return to_elo(score), to_elo(score - margin), to_elo(score + margin)
+
+def format_pgn(game, label_a, label_b, round_no):
+    white, black = (label_a, label_b) if game["a_white"] else (label_b, label_a)
+    headers = [("Event", "Yapay-zeka kendi kendine maç"), ("Site", "yerel"), ("Round", str(round_no)),
+               ("White", white), ("Black", black), ("Result", game["result"]), ("Termination", game["reason"])]
+    if game["fen"] != START_FEN: headers += [("SetUp", "1"), ("FEN", game["fen"])]
+    return "".join(f'[{k} "{v}"]\n' for k, v in headers) + f"\n{game['moves']} {game['result']}\n\n"
+
+def run_match(config_a, config_b, games, openings, workers, max_plies, on_game=None, backend="mailbox"):
+    # Her açılış iki kez, renkler değiştirilerek oynanır; sonuçlar oyun sırasına göre döner
+    jobs = [(i, openings[(i // 2) % len(openings)], config_a, config_b, i % 2 == 0, max_plies, backend) for i in range(games)]
+    results = []
+    if workers <= 1:
+        for job in jobs:
+            results.append(play_game(*job))
+            if on_game: on_game(results[-1], len(results))
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for future in as_completed([pool.submit(play_game, *job) for job in jobs]):
+                results.append(future.result())
+                if on_game: on_game(results[-1], len(results))
+    return sorted(results, key=lambda g: g["index"])
+
+def a_points(game):
+    if game["result"] == "1/2-1/2": return 0.5
+    return 1.0 if (game["result"] == "1-0") == game["a_white"] else 0.0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="İki ChessAI ayarı arasında arayüzsüz, paralel maç oynatır.")
+    parser.add_argument("--a", default="depth=3", help="A motorunun ayarları (ör. depth=4,use_lmr=false)")
+    parser.add_argument("--b", default="depth=3", help="B motorunun ayarları")
+    parser.add_argument("--games", type=int, default=10, help="Oyun sayısı (renkler her oyunda değişir)")
+    parser.add_argument("--openings", help="Açılış pozisyonları (satır başına FEN/EPD)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Paralel oyun sayısı")
+    parser.add_argument("--max-plies", type=int, default=300, help="Bu yarım hamleden sonra beraberlik ilan edilir")
+    parser.add_argument("--pgn", help="Oyunların yazılacağı PGN dosyası")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="mailbox", help="Oyunlarda kullanılan konum gösterimi")
+    args = parser.parse_args(argv)
+    try:
+        config_a = parse_engine(args.a); config_b = parse_engine(args.b)
+        openings = load_openings(args.openings)
+    except (ValueError, OSError) as e: parser.error(str(e))
+    label_a, label_b = f"A ({args.a})", f"B ({args.b})"
+
+    def report(game, done):
+        color = "beyaz" if game["a_white"] else "siyah"
+        print(f"Oyun {game['index'] + 1:>3} ({done}/{args.games}): A {color}, {game['result']} - {game['reason']}, {game['plies']} yarım hamle")
+    start = time.perf_counter()
+    results = run_match(config_a, config_b, args.games, openings, max(1, args.workers), args.max_plies, report, args.backend)
+
+    if args.pgn:
+        with open(args.pgn, "w", encoding="utf-8") as f:
+            for game in results: f.write(format_pgn(game, label_a, label_b, game["index"] + 1))
+    points = [a_points(g) for g in results]
+    wins, draws, losses = points.count(1.0), points.count(0.5), points.count(0.0)
+    elo, low, high = elo_difference(wins, draws, losses)
+    nodes_a = sum(g["nodes"][0] for g in results); nodes_b = sum(g["nodes"][1] for g in results)
+    time_a = sum(g["time"][0] for g in results); time_b = sum(g["time"][1] for g in results)
+    print(f"\n{label_a} - {label_b}: +{wins} ={draws} -{losses}  ({wins + draws / 2:g}/{len(results)})")
+    interval = f"[%95: {low:+.1f}, {high:+.1f}]" if low is not None else "[%95: tanımsız, bütün oyunlar aynı sonuçla bitti]"
+    print(f"Elo farkı (A - B): {elo:+.1f}  {interval}")
+    print(f"Düğüm/s: A {nodes_a / time_a if time_a else 0:,.0f}, B {nodes_b / time_b if time_b else 0:,.0f}")
+    print(f"Süre: {time.perf_counter() - start:.1f}s" + (f", PGN -> {args.pgn}" if args.pgn else ""))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
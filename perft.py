@@ -0,0 +1,79 @@
+﻿import sys
+import json
+import time
+import argparse
+from satranc_motoru import BACKENDS, Move
+
+# ==========================================
+# PERFT: HAMLE ÜRETİCİSİ DOĞRULAMA VE HIZ ÖLÇÜMÜ
+# ==========================================
+# Kullanım:
+#   python perft.py --depth 4
+#   python perft.py --fen "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -" --depth 3 --divide
+#   python perft.py --reference perft_referans.json --depth 4 --backend bitboard
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+def perft(gs, depth):
+    moves = gs.get_valid_move_codes()
+    if depth <= 1: return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        gs.make_move(move)
+        nodes += perft(gs, depth - 1)
+        gs.undo_move()
+    return nodes
+
+def divide(gs, depth):
+    # Kök hamlesi başına yaprak sayısı: referans motorla karşılaştırıp hatalı dalı bulmak için
+    counts = {}
+    for move in gs.get_valid_move_codes():
+        uci = Move.from_code(move, gs.board).get_uci()
+        gs.make_move(move)
+        counts[uci] = perft(gs, depth - 1)
+        gs.undo_move()
+    return counts
+
+def run_position(backend, fen, depth, show_divide=False):
+    gs = BACKENDS[backend]().load_fen(fen)
+    start = time.perf_counter()
+    if show_divide:
+        counts = divide(gs, depth)
+        for uci in sorted(counts): print(f"{uci}: {counts[uci]}")
+        nodes = sum(counts.values())
+    else: nodes = perft(gs, depth)
+    elapsed = time.perf_counter() - start
+    nps = nodes / elapsed if elapsed > 0 else 0.0
+    return nodes, elapsed, nps
+
+def run_reference(backend, filename, max_depth):
+    with open(filename, "r", encoding="utf-8") as f: reference = json.load(f)
+    failures = 0; total_nodes = 0; total_time = 0.0
+    for position in reference["positions"]:
+        for depth, expected in enumerate(position["nodes"], 1):
+            if depth > max_depth: break
+            nodes, elapsed, nps = run_position(backend, position["fen"], depth)
+            total_nodes += nodes; total_time += elapsed
+            status = "OK" if nodes == expected else f"HATA (beklenen {expected})"
+            if nodes != expected: failures += 1
+            print(f"{position['name']:<12} derinlik {depth}: {nodes:>10} düğüm  {elapsed:7.2f}s  {nps:>10,.0f} düğüm/s  {status}")
+    if total_time > 0: print(f"Toplam: {total_nodes:,} düğüm, {total_time:.2f}s, {total_nodes / total_time:,.0f} düğüm/s")
+    print("✅ Tüm sayımlar referansla eşleşti." if failures == 0 else f"❌ {failures} sayım referansla eşleşmedi.")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft: yasal hamle üreticisini yaprak sayımıyla doğrular ve hızını ölçer.")
+    parser.add_argument("--fen", default=START_FEN, help="Başlangıç pozisyonu (FEN)")
+    parser.add_argument("--depth", type=int, default=3, help="Arama derinliği")
+    parser.add_argument("--divide", action="store_true", help="Kök hamlesi başına yaprak sayısını yazdır")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="mailbox", help="Pozisyon arka ucu")
+    parser.add_argument("--reference", help="Referans sayımlarını içeren JSON dosyası")
+    args = parser.parse_args(argv)
+
+    if args.reference: return 1 if run_reference(args.backend, args.reference, args.depth) else 0
+    nodes, elapsed, nps = run_position(args.backend, args.fen, args.depth, args.divide)
+    print(f"Derinlik {args.depth}: {nodes:,} düğüm, {elapsed:.2f}s, {nps:,.0f} düğüm/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1676 @@
+﻿import random
+import time
+import json
+import os
+import copy
+import mmap
+import struct
+
+# Arayüzsüz satranç motoru: PyQt6 içe aktarmaz; final_oyun.py (arayüz), uci_motor.py ve perft.py buradan kullanır
+
+# ==========================================
+# 1. BÖLÜM: YAPAY ZEKA
+# ==========================================
+# --- AÇILIŞ KİTABI DOSYASI ---
+# Başlık (sihirli sözcük, kayıt sayısı) + konum anahtarına göre sıralı sabit boyutlu kayıtlar.
+# Kayıt: konum anahtarı (GameState.book_key), hamle (çıkış | varış << 6 | terfi << 12), ağırlık
+BOOK_MAGIC = b"YZKB"
+BOOK_HEADER = struct.Struct("<4sI")
+BOOK_ENTRY = struct.Struct("<QHI")
+# Varsayılan veri dosyaları motorun klasöründen okunur: UCI motoru başka klasörden başlatılsa da kitap bulunur
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOK_FILE = os.path.join(ENGINE_DIR, "beyin.bin")
+
+def encode_book_move(uci):
+    promo = PROMOTION_PIECES.index(uci[4].upper()) if len(uci) > 4 else 0
+    return SQUARE_NAMES.index(uci[:2]) | SQUARE_NAMES.index(uci[2:4]) << 6 | promo << 12
+
+def write_book(entries, filename):
+    # entries: (anahtar, kitap hamlesi, ağırlık); aynı konum+hamle ağırlıkları toplanır
+    merged = {}
+    for key, move, weight in entries: merged[(key, move)] = merged.get((key, move), 0) + weight
+    with open(filename, "wb") as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, len(merged)))
+        for (key, move), weight in sorted(merged.items()): f.write(BOOK_ENTRY.pack(key, move, min(weight, 0xFFFFFFFF)))
+    return len(merged)
+
+class OpeningBook:
+    # Dosya mmap ile açılır: yükleme süresi yok, işçi süreçleri aynı sayfaları paylaşır
+    def __init__(self, book_file=BOOK_FILE):
+        self.data = None; self.size = 0
+        self.load_book(book_file)
+    def load_book(self, filename):
+        if not os.path.exists(filename): return
+        try:
+            with open(filename, "rb") as f: data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError): return
+        magic, count = BOOK_HEADER.unpack_from(data) if len(data) >= BOOK_HEADER.size else (b"", 0)
+        if magic != BOOK_MAGIC or len(data) < BOOK_HEADER.size + count * BOOK_ENTRY.size:
+            print(f"⚠️ Geçersiz kitap dosyası: {filename}"); data.close(); return
+        self.data = data; self.size = count
+    def close(self):
+        if self.data is not None: self.data.close(); self.data = None; self.size = 0
+    def get_entries(self, key):
+        # İkili arama ile anahtarın ilk kaydı, ardından aynı anahtarlı ardışık kayıtlar
+        if self.data is None: return []
+        data = self.data; lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if BOOK_ENTRY.unpack_from(data, BOOK_HEADER.size + mid * BOOK_ENTRY.size)[0] < key: lo = mid + 1
+            else: hi = mid
+        entries = []
+        while lo < self.size:
+            entry_key, move, weight = BOOK_ENTRY.unpack_from(data, BOOK_HEADER.size + lo * BOOK_ENTRY.size)
+            if entry_key != key: break
+            entries.append((move, weight)); lo += 1
+        return entries
+    def get_book_move(self, gs, valid_moves):
+        # Ağırlıklı rastgele seçim; yalnızca yasal hamlelerle eşleşen kayıtlar sayılır
+        if self.data is None: return None
+        by_code = {m.move_id & 4095 | (m.move_id >> 15) << 12: m for m in valid_moves}
+        candidates = [(by_code[move], weight) for move, weight in self.get_entries(gs.book_key()) if move in by_code and weight > 0]
+        if not candidates: return None
+        return random.choices([m for m, _ in candidates], [w for _, w in candidates])[0]
+
+# --- SON OYUN BİTBAZLARI ---
+# Şah + tek taş (P, R, Q) - şah; bitbaz_uret.py ile geriye doğru analizle yerelde üretilir (bitbaz/kpk.bin, krk.bin, kqk.bin).
+# Dosya: başlık (sihirli sözcük, kayıt başına bit, kayıt sayısı) + LSB'den başlayarak bit paketli kayıtlar.
+# Kayıt: 0 = beraberlik ya da yasa dışı konum, n > 0 = güçlü taraf n - 1 yarım hamlede mat eder (zayıf taraf için kayıp).
+# İndeks: güçlü taraf beyaza çevrilir (gerekirse tahta dikey aynalanır), bkz. bitbase_index
+BITBASE_MAGIC = b"YZBB"
+BITBASE_HEADER = struct.Struct("<4sBI")
+BITBASE_PIECES = ("P", "R", "Q")
+BITBASE_SIZE = 2 * 64 * 64 * 64
+BITBASE_DIR = os.path.join(ENGINE_DIR, "bitbaz")
+
+def bitbase_index(strong_to_move, strong_king, weak_king, piece_sq):
+    return (0 if strong_to_move else 1) << 18 | strong_king << 12 | weak_king << 6 | piece_sq
+
+def write_bitbase(values, filename):
+    bits = max(1, max(values).bit_length())
+    if bits > 8: raise ValueError(f"Kayıt değeri 8 bite sığmıyor: {max(values)}")
+    data = bytearray((len(values) * bits + 7) // 8 + 1)  # +1: okuma iki baytlık pencereyle yapılır
+    for i, value in enumerate(values):
+        if value:
+            pos = i * bits; window = value << (pos & 7)
+            data[pos >> 3] |= window & 255; data[(pos >> 3) + 1] |= window >> 8
+    with open(filename, "wb") as f:
+        f.write(BITBASE_HEADER.pack(BITBASE_MAGIC, bits, len(values))); f.write(data)
+    return bits, BITBASE_HEADER.size + len(data)
+
+class EndgameBitbases:
+    # Dosyalar mmap ile açılır; olmayan tablo sessizce atlanır (probe None döner)
+    def __init__(self, directory=BITBASE_DIR):
+        self.tables = {}  # taş türü -> (mmap, kayıt başına bit, maske)
+        for piece in BITBASE_PIECES: self.load(piece, os.path.join(directory, f"k{piece.lower()}k.bin"))
+    def load(self, piece, filename):
+        if not os.path.exists(filename): return
+        try:
+            with open(filename, "rb") as f: data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError): return
+        magic, bits, count = BITBASE_HEADER.unpack_from(data) if len(data) >= BITBASE_HEADER.size else (b"", 0, 0)
+        if magic != BITBASE_MAGIC or count != BITBASE_SIZE or not 1 <= bits <= 8 or len(data) < BITBASE_HEADER.size + (count * bits + 7) // 8 + 1:
+            print(f"⚠️ Geçersiz bitbaz dosyası: {filename}"); data.close(); return
+        self.tables[piece] = (data, bits, (1 << bits) - 1)
+    def close(self):
+        for data, _, _ in self.tables.values(): data.close()
+        self.tables = {}
+    def value(self, piece, index):
+        data, bits, mask = self.tables[piece]
+        pos = index * bits; at = BITBASE_HEADER.size + (pos >> 3)
+        return ((data[at] | data[at + 1] << 8) >> (pos & 7)) & mask
+    def probe(self, gs):
+        # Üç taşlı konum için (sonuç, mata kalan yarım hamle); sonuç sıradaki tarafa göre 1 kazanç, 0 beraberlik, -1 kayıp.
+        # Yalnız şahlar ve şah + at/fil - şah her zaman beraberliktir; tablosu olmayan ya da üçten fazla taşlı konumda None.
+        counts = gs.piece_counts; total = sum(counts.values())
+        if total > 3: return None
+        piece = next((p for p in ("wP", "bP", "wR", "bR", "wQ", "bQ", "wN", "bN", "wB", "bB") if counts[p]), None)
+        if piece is None or piece[1] in "NB": return 0, 0
+        if piece[1] not in self.tables: return None
+        row = next(r for r in range(8) if piece in gs.board[r]); piece_sq = row * 8 + gs.board[row].index(piece)
+        white_king = gs.white_king_location[0] * 8 + gs.white_king_location[1]
+        black_king = gs.black_king_location[0] * 8 + gs.black_king_location[1]
+        if piece[0] == 'w': strong_to_move = gs.white_to_move; index = bitbase_index(strong_to_move, white_king, black_king, piece_sq)
+        else: strong_to_move = not gs.white_to_move; index = bitbase_index(strong_to_move, black_king ^ 56, white_king ^ 56, piece_sq ^ 56)
+        value = self.value(piece[1], index)
+        if value == 0: return 0, 0
+        return (1 if strong_to_move else -1), value - 1
+
+class TranspositionTable:
+    # Sabit boyutlu tablo: indeks = zobrist_key & mask, giriş = (key, depth, flag, score, best_move_id, age)
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, size=1 << 18):
+        self.size = 1 << (max(1, size) - 1).bit_length()
+        self.mask = self.size - 1
+        self.table = [None] * self.size
+        self.age = 0
+        self.hits = 0; self.probes = 0
+
+    def clear(self):
+        self.table = [None] * self.size
+        self.age = 0; self.hits = 0; self.probes = 0
+
+    def new_search(self):
+        self.age += 1
+
+    def probe(self, key):
+        self.probes += 1
+        entry = self.table[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, flag, score, best_move_id):
+        idx = key & self.mask
+        old = self.table[idx]
+        # Değiştirme politikası: boş, aynı pozisyon, eski aramadan kalan ya da daha sığ giriş ezilir
+        if old is None or old[0] == key or old[5] != self.age or depth >= old[1]:
+            if best_move_id is None and old is not None and old[0] == key: best_move_id = old[4]
+            self.table[idx] = (key, depth, flag, score, best_move_id, self.age)
+
+class PawnHashTable:
+    # Piyon yapısı önbelleği: anahtar yalnızca piyon yerleşimidir (GameState.pawn_key), bu yüzden isabet oranı TT'den çok yüksektir.
+    # Giriş = (pawn_key, puan, beyaz geçer piyon maskesi, siyah geçer piyon maskesi); çakışmada yeni giriş eskisini ezer.
+    def __init__(self, size=1 << 14):
+        self.size = 1 << (max(1, size) - 1).bit_length()
+        self.mask = self.size - 1
+        self.table = [None] * self.size
+        self.hits = 0; self.probes = 0
+
+    def clear(self):
+        self.table = [None] * self.size
+        self.hits = 0; self.probes = 0
+
+    def probe(self, key, board):
+        # Kayıt yoksa piyon yapısı tahtadan hesaplanıp yazılır; her durumda giriş döner
+        self.probes += 1
+        idx = key & self.mask
+        entry = self.table[idx]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        entry = self.table[idx] = (key,) + evaluate_pawns(board)
+        return entry
+
+class SearchTelemetry:
+    # Tamamlanan her derinlik için bir kayıt; sayaçlar ChessAI.search_counters sırasıyla:
+    # (düğüm, açılan düğüm, beta kesmesi, ilk hamlede kesme, TT isabeti, TT sorgusu, piyon tablosu isabeti, piyon tablosu sorgusu)
+    def __init__(self, jsonl_file=None):
+        self.jsonl_file = jsonl_file  # verilirse her kayıt JSON satırı olarak eklenir
+        self.iterations = []
+        self.start_time = 0.0; self.base = self.last = (0,) * 8
+
+    def start(self, counters):
+        self.iterations = []; self.start_time = time.time(); self.base = self.last = counters
+
+    def record(self, counters, depth, move, score):
+        elapsed = time.time() - self.start_time
+        nodes, expanded, cutoffs, first_cutoffs, hits, probes, pawn_hits, pawn_probes = (c - l for c, l in zip(counters, self.last))
+        total = counters[0] - self.base[0]
+        previous = self.iterations[-1]["iteration_nodes"] if self.iterations else 0
+        entry = {
+            "depth": depth, "move": move, "score": score, "nodes": total, "iteration_nodes": nodes,
+            "elapsed": round(elapsed, 4), "nps": int(total / elapsed) if elapsed > 0 else 0,
+            "ebf": round(nodes / previous, 2) if previous else None,  # etkin dallanma: bu / önceki derinliğin düğümü
+            "beta_cutoff_rate": round(cutoffs / expanded, 4) if expanded else None,
+            "first_move_cutoff_rate": round(first_cutoffs / cutoffs, 4) if cutoffs else None,  # hamle sıralama kalitesi
+            "tt_hit_rate": round(hits / probes, 4) if probes else None,
+            "pawn_hit_rate": round(pawn_hits / pawn_probes, 4) if pawn_probes else None,
+        }
+        self.last = counters; self.iterations.append(entry)
+        if self.jsonl_file:
+            with open(self.jsonl_file, "a", encoding="utf-8") as f: f.write(json.dumps(entry) + "\n")
+        return entry
+
+PIECE_SCORE = {"K": 0, "Q": 900, "R": 500, "B": 330, "N": 320, "P": 100}
+
+# --- KONUM TABLOLARI (PST) ---
+PAWN_SCORES = [
+    [0,  0,  0,  0,  0,  0,  0,  0],
+    [50, 50, 50, 50, 50, 50, 50, 50],
+    [10, 10, 20, 30, 30, 20, 10, 10],
+    [5,  5, 10, 25, 25, 10,  5,  5],
+    [0,  0,  0, 20, 20,  0,  0,  0],
+    [5, -5,-10,  0,  0,-10, -5,  5],
+    [5, 10, 10,-20,-20, 10, 10,  5],
+    [0,  0,  0,  0,  0,  0,  0,  0]
+]
+KNIGHT_SCORES = [
+    [-50,-40,-30,-30,-30,-30,-40,-50],
+    [-40,-20,  0,  0,  0,  0,-20,-40],
+    [-30,  0, 10, 15, 15, 10,  0,-30],
+    [-30,  5, 15, 20, 20, 15,  5,-30],
+    [-30,  0, 15, 20, 20, 15,  0,-30],
+    [-30,  5, 10, 15, 15, 10,  5,-30],
+    [-40,-20,  0,  5,  5,  0,-20,-40],
+    [-50,-40,-30,-30,-30,-30,-40,-50]
+]
+BISHOP_SCORES = [
+    [-20,-10,-10,-10,-10,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5, 10, 10,  5,  0,-10],
+    [-10,  5,  5, 10, 10,  5,  5,-10],
+    [-10,  0, 10, 10, 10, 10,  0,-10],
+    [-10, 10, 10, 10, 10, 10, 10,-10],
+    [-10,  5,  0,  0,  0,  0,  5,-10],
+    [-20,-10,-10,-10,-10,-10,-10,-20]
+]
+ROOK_SCORES = [
+    [0,  0,  0,  0,  0,  0,  0,  0],
+    [5, 10, 10, 10, 10, 10, 10,  5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [-5,  0,  0,  0,  0,  0,  0, -5],
+    [0,  0,  0,  5,  5,  0,  0,  0]
+]
+QUEEN_SCORES = [
+    [-20,-10,-10, -5, -5,-10,-10,-20],
+    [-10,  0,  0,  0,  0,  0,  0,-10],
+    [-10,  0,  5,  5,  5,  5,  0,-10],
+    [-5,   0,  5,  5,  5,  5,  0, -5],
+    [0,    0,  5,  5,  5,  5,  0, -5],
+    [-10,  5,  5,  5,  5,  5,  0,-10],
+    [-10,  0,  5,  0,  0,  0,  0,-10],
+    [-20,-10,-10, -5, -5,-10,-10,-20]
+]
+KING_SCORES = [
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-30,-40,-40,-50,-50,-40,-40,-30],
+    [-20,-30,-30,-40,-40,-30,-30,-20],
+    [-10,-20,-20,-20,-20,-20,-20,-10],
+    [20, 20,  0,  0,  0,  0, 20, 20],
+    [20, 30, 10,  0,  0, 10, 30, 20]
+]
+MAX_PLY = 64  # katil, PV tabloları ve en büyük arama derinliği için üst sınır
+MATE_THRESHOLD = 9000  # mutlak değeri bunun üstündeki puanlar mat (ya da bitbaz kazancı): köke uzaklığı (ply) içerir
+ORDER_VALUES = {"P": 1, "N": 2, "B": 3, "R": 4, "Q": 5, "K": 6}  # MVV-LVA sıralaması için kaba taş sırası
+PIECE_POSITION_SCORES = {"N": KNIGHT_SCORES, "B": BISHOP_SCORES, "Q": QUEEN_SCORES, "R": ROOK_SCORES, "P": PAWN_SCORES, "K": KING_SCORES}
+
+# Artımlı değerlendirme tabloları: beyaz +, siyah -; kare indeksi = satır * 8 + sütun
+PIECE_MATERIAL = {c + t: (PIECE_SCORE[t] if c == 'w' else -PIECE_SCORE[t]) for c in "wb" for t in "PNBRQK"}
+PIECE_SQUARE_VALUES = {c + t: [PIECE_POSITION_SCORES[t][sq >> 3][sq & 7] if c == 'w' else -PIECE_POSITION_SCORES[t][7 - (sq >> 3)][sq & 7] for sq in range(64)]
+                       for c in "wb" for t in "PNBRQK"}
+
+# --- PİYON YAPISI ---
+DOUBLED_PAWN_PENALTY = 15  # aynı dosyadaki her fazladan piyon
+ISOLATED_PAWN_PENALTY = 12  # komşu dosyalarında kendi piyonu olmayan piyon
+PASSED_PAWN_BONUS = (0, 5, 10, 20, 35, 60, 100, 0)  # kendi arka sırasından ilerleyişe göre (indeks 1 = başlangıç sırası)
+
+def evaluate_pawns(board):
+    # Piyon yapısı puanı (beyaz +): katmerli, izole ve geçer piyonlar. Yalnızca piyon yerleşimine bağlıdır; PawnHashTable önbelleğe alır.
+    # Dönüş: (puan, beyaz geçer piyonlar, siyah geçer piyonlar); maskelerde bit = satır * 8 + sütun. Dosya dizileri iki yandan dolguludur.
+    white_files = [0] * 10; black_files = [0] * 10
+    black_front = [8] * 10; white_front = [-1] * 10  # dosya başına en ileri siyah (en küçük satır) ve beyaz (en büyük satır) piyon
+    white_pawns = []; black_pawns = []
+    for r in range(8):
+        row = board[r]
+        for c in range(8):
+            p = row[c]
+            if p == "wP":
+                white_pawns.append((r, c)); white_files[c + 1] += 1
+                if r > white_front[c + 1]: white_front[c + 1] = r
+            elif p == "bP":
+                black_pawns.append((r, c)); black_files[c + 1] += 1
+                if r < black_front[c + 1]: black_front[c + 1] = r
+    score = 0; white_passed = 0; black_passed = 0
+    for f in range(1, 9):
+        if white_files[f] > 1: score -= DOUBLED_PAWN_PENALTY * (white_files[f] - 1)
+        if black_files[f] > 1: score += DOUBLED_PAWN_PENALTY * (black_files[f] - 1)
+    for r, c in white_pawns:
+        if not white_files[c] and not white_files[c + 2]: score -= ISOLATED_PAWN_PENALTY
+        # Geçer piyon: önündeki satırlarda aynı ya da komşu dosyada rakip piyon yok
+        if min(black_front[c], black_front[c + 1], black_front[c + 2]) >= r:
+            score += PASSED_PAWN_BONUS[7 - r]; white_passed |= 1 << (r * 8 + c)
+    for r, c in black_pawns:
+        if not black_files[c] and not black_files[c + 2]: score += ISOLATED_PAWN_PENALTY
+        if max(white_front[c], white_front[c + 1], white_front[c + 2]) <= r:
+            score -= PASSED_PAWN_BONUS[r]; black_passed |= 1 << (r * 8 + c)
+    return score, white_passed, black_passed
+
+def _batch_pawn_scores(boards):
+    # evaluate_pawns'ın (N, 64) taş kodu dizisi üzerinde vektörel karşılığı (ChessAI.score_boards için)
+    import numpy as np
+    wp = (boards == PIECE_INDEX["wP"]).reshape(-1, 8, 8); bp = (boards == PIECE_INDEX["bP"]).reshape(-1, 8, 8)
+    white_files = wp.sum(axis=1); black_files = bp.sum(axis=1)
+    scores = DOUBLED_PAWN_PENALTY * (np.maximum(black_files - 1, 0).sum(axis=1) - np.maximum(white_files - 1, 0).sum(axis=1))
+    def neighbours(mask):  # (N, 8) dosya maskesi -> komşu dosyalardan biri doluysa True
+        padded = np.pad(mask, ((0, 0), (1, 1)))
+        return padded[:, :-2] | padded[:, 2:]
+    scores -= ISOLATED_PAWN_PENALTY * (white_files * ~neighbours(white_files > 0)).sum(axis=1)
+    scores += ISOLATED_PAWN_PENALTY * (black_files * ~neighbours(black_files > 0)).sum(axis=1)
+    # Beyaz piyonun önü küçük satırlar, siyahınki büyük satırlar; engel aynı ya da komşu dosyada önde duran rakip piyondur
+    black_ahead = np.zeros_like(bp); black_ahead[:, 1:] = np.logical_or.accumulate(bp, axis=1)[:, :-1]
+    white_ahead = np.zeros_like(wp); white_ahead[:, :-1] = np.logical_or.accumulate(wp[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    def spread(mask):  # (N, 8, 8) -> aynı ya da komşu dosyada
+        padded = np.pad(mask, ((0, 0), (0, 0), (1, 1)))
+        return padded[:, :, :-2] | padded[:, :, 1:-1] | padded[:, :, 2:]
+    bonus = np.array(PASSED_PAWN_BONUS, dtype=np.int64)
+    scores += ((wp & ~spread(black_ahead)).sum(axis=2) * bonus[::-1]).sum(axis=1)
+    scores -= ((bp & ~spread(white_ahead)).sum(axis=2) * bonus).sum(axis=1)
+    return scores
+
+# Paralel aramada işçi süreçlerin ChessAI'sine aktarılan arama ayarları
+SEARCH_SETTINGS = ("use_null_move", "null_move_reduction", "null_move_min_depth", "use_lmr", "lmr_min_depth", "lmr_move_index",
+                   "use_quiescence", "quiescence_node_limit", "aspiration_window", "use_pawn_structure", "use_bitbases")
+
+def positive_int(name, value):
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1: raise ValueError(f"{name} pozitif tam sayı olmalı: {value!r}")
+    return value
+
+class ChessAI:
+    def __init__(self):
+        self.CHECKMATE = 10000; self.STALEMATE = 0
+        self.opening_book = OpeningBook()
+        self.bitbases = EndgameBitbases()
+        self.use_bitbases = True
+        self.tt = TranspositionTable()
+        # Piyon yapısı terimleri (katmerli/izole/geçer) ayrı, piyon anahtarlı tabloda önbelleğe alınır
+        self.pawn_table = PawnHashTable()
+        self.use_pawn_structure = True
+        self.piece_score = PIECE_SCORE
+        self.nodes_visited = 0
+        # Telemetri: derinlik başına istatistikler; on_iteration verilirse her kayıtla çağrılır
+        self.expanded_nodes = 0; self.beta_cutoffs = 0; self.first_move_cutoffs = 0
+        self.telemetry = SearchTelemetry()
+        self.on_iteration = None
+        # Sükunet araması: yaprakta yalnızca alışlar/terfiler, yaprak başına düğüm sınırıyla
+        self.use_quiescence = True
+        self.quiescence_node_limit = 2000
+        self.quiescence_nodes_left = 0
+        # Hamle sıralaması: ply başına iki katil hamle, sessiz hamleler için geçmiş tablosu
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {p: [0] * 64 for p in PIECE_MATERIAL}
+        # Paralel arama: kök hamleleri süreç havuzundaki işçilere bölünür
+        self.parallel_search = False
+        self.search_workers = 1
+        self.pool = None; self.pool_size = 0; self.pool_settings = None; self.shared_alpha = None
+        self.search_id = 0
+        # Dışarıdan durdurma (UCI "stop"): arama en geç 1000 düğümde bir bu bayrağa bakar
+        self.stop_requested = False
+        self.verbose = True  # derinlik çıktıları stdout'a; UCI modunda kapalı
+        # PVS ve kökte aspirasyon penceresi; ana varyant ply başına üçgen tabloda tutulur
+        self.aspiration_window = 50
+        self.pv = [[] for _ in range(MAX_PLY + 1)]
+        self.principal_variation = []  # son tamamlanan derinliğin ana varyantı (hamle kodları)
+        # İleri budama: boş hamle (şah altında ve piyon dışı taşı olmayan tarafta kapalı) ve geç hamle azaltması (LMR)
+        self.use_null_move = True
+        self.null_move_reduction = 2
+        self.null_move_min_depth = 3
+        self.use_lmr = True
+        self.lmr_min_depth = 3
+        self.lmr_move_index = 3  # bu sıradan sonraki sessiz hamleler azaltılmış derinlikte aranır
+        self.null_cutoffs = 0; self.lmr_researches = 0
+
+        # --- KONUM TABLOLARI (PST) ---
+        self.pawn_scores = PAWN_SCORES
+        self.knight_scores = KNIGHT_SCORES
+        self.bishop_scores = BISHOP_SCORES
+        self.rook_scores = ROOK_SCORES
+        self.queen_scores = QUEEN_SCORES
+        self.king_scores = KING_SCORES
+        self.piece_position_scores = PIECE_POSITION_SCORES
+
+    # LMR ayarları dışarıdan (UCI, maç yöneticisi) değiştirilebildiği için atamada doğrulanır
+    @property
+    def lmr_min_depth(self): return self._lmr_min_depth
+    @lmr_min_depth.setter
+    def lmr_min_depth(self, value): self._lmr_min_depth = positive_int("lmr_min_depth", value)
+    @property
+    def lmr_move_index(self): return self._lmr_move_index
+    @lmr_move_index.setter
+    def lmr_move_index(self, value): self._lmr_move_index = positive_int("lmr_move_index", value)
+
+    def prepare_search(self):
+        self.tt.new_search()
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.principal_variation = []
+        for table in self.history.values():
+            for i in range(64): table[i] >>= 1  # geçmiş aramalar arasında yarılanarak korunur
+
+    def think_time(self, remaining, increment=0.0, moves_to_go=None):
+        # Kalan süre ve artışa göre hamle başına düşünme süresi (saniye)
+        share = remaining / max(1, moves_to_go) if moves_to_go else remaining * 0.05
+        return max(0.5, min(15.0, share + increment, remaining * 0.5))
+
+    def get_ponder_move(self, gs):
+        # Rakibin beklenen cevabı: ana varyantın ikinci hamlesi, yoksa bu konum için TT'deki en iyi hamle
+        valid = gs.get_valid_move_codes(); pv = self.principal_variation
+        if len(pv) > 1 and gs.move_log and gs.move_log[-1] == pv[0] and pv[1] in valid: return pv[1]
+        entry = self.tt.probe(gs.zobrist_key)
+        if entry is None or entry[4] is None: return None
+        return entry[4] if entry[4] in valid else None
+
+    def search_counters(self):
+        return (self.nodes_visited, self.expanded_nodes, self.beta_cutoffs, self.first_move_cutoffs, self.tt.hits, self.tt.probes,
+                self.pawn_table.hits, self.pawn_table.probes)
+
+    def report_iteration(self, depth, move, score, counters=None):
+        entry = self.telemetry.record(counters if counters is not None else self.search_counters(), depth, move.get_uci(), score)
+        entry["pv"] = [move_uci(code) for code in self.principal_variation] or [move.get_uci()]
+        if self.on_iteration is not None: self.on_iteration(entry)
+
+    def find_best_move_smart(self, gs, valid_moves, time_limit, fixed_depth=None):
+        if self.parallel_search: return self.find_best_move_parallel(gs, valid_moves, time_limit, fixed_depth)
+        self.nodes_visited = 0
+        self.prepare_search()
+        self.telemetry.start(self.search_counters())
+        start_time = time.time()
+        
+        book_move = self.opening_book.get_book_move(gs, valid_moves)
+        if book_move: return book_move, 0.0, 1, 1
+
+        best_global_move = None
+        best_global_score = -float('inf')
+        
+        random.shuffle(valid_moves)
+        valid_moves.sort(key=lambda m: (100 if m.piece_captured != "--" else 0), reverse=True)
+
+        current_depth = 1
+        history = [] 
+        root_ply = len(gs.move_log)
+        max_search_depth = min(fixed_depth, MAX_PLY - 1) if fixed_depth else 20
+        limit_check = time_limit if time_limit else 999999
+
+        while current_depth <= max_search_depth:
+            if self.stop_requested or (time_limit and (time.time() - start_time > time_limit)): break
+
+            try:
+                # OPTIMIZATION: Move Ordering
+                if best_global_move:
+                    valid_moves.sort(key=lambda m: m.move_id == best_global_move.move_id, reverse=True)
+
+                # Aspirasyon: önceki puan etrafında dar pencere; taşarsa taşan taraf genişletilip yeniden aranır
+                delta = self.aspiration_window
+                if current_depth >= 3 and delta and abs(best_global_score) < MATE_THRESHOLD:
+                    alpha, beta = max(-self.CHECKMATE, best_global_score - delta), min(self.CHECKMATE, best_global_score + delta)
+                else: alpha, beta = -self.CHECKMATE, self.CHECKMATE
+                while True:
+                    best_move_this_depth, best_score_this_depth = self.search_root(gs, valid_moves, current_depth, alpha, beta, start_time, limit_check)
+                    if best_score_this_depth <= alpha and alpha > -self.CHECKMATE: delta *= 4; alpha = max(-self.CHECKMATE, best_score_this_depth - delta)
+                    elif best_score_this_depth >= beta and beta < self.CHECKMATE: delta *= 4; beta = min(self.CHECKMATE, best_score_this_depth + delta)
+                    else: break
+
+                best_global_move = best_move_this_depth
+                best_global_score = best_score_this_depth
+                self.principal_variation = self.pv[0][:]
+                self.tt.store(gs.zobrist_key, current_depth, TranspositionTable.EXACT, best_global_score, best_global_move.move_id)
+                history.append(best_global_move)
+                
+                self.report_iteration(current_depth, best_global_move, best_global_score)
+                if self.verbose: print(f"🔎 Derinlik {current_depth}: {best_global_move.get_chess_notation()} ({best_global_score:.2f})")
+
+                if time_limit:
+                    if best_global_score > MATE_THRESHOLD: break
+                    if len(history) >= 4 and all(x == history[-1] for x in history[-4:]):
+                        if time.time() - start_time > (time_limit * 0.6):
+                            if self.verbose: print("🚀 Hamle kararlı, erken kesiliyor.")
+                            break
+            except TimeoutError:
+                # Yarıda kalan aramanın yaptığı hamleler geri alınır; pozisyon çağırana aramadan önceki haliyle döner
+                while len(gs.move_log) > root_ply: gs.undo_move()
+                break 
+            current_depth += 1
+
+        if not best_global_move and valid_moves: best_global_move = valid_moves[0]
+        return best_global_move, best_global_score, self.nodes_visited, (current_depth - 1)
+
+    def search_root(self, gs, valid_moves, depth, alpha, beta, start_time, time_limit, results=None, shared=None):
+        # Kök PVS: ilk hamle tam pencereyle, diğerleri sıfır pencereyle; pencereyi aşan hamle tam pencereyle yeniden aranır.
+        # Puan beta'yı geçerse (aspirasyon taşması) erken döner.
+        # Paralel işçide results her hamlenin (kod, puan, kesin mi) sonucunu toplar; shared işçiler arası ortak alpha'dır ve
+        # yalnızca kesin puanla yükseltilir
+        best_move = None; best_score = -float('inf')
+        self.pv[0] = []
+        for i, move in enumerate(valid_moves):
+            if shared is not None and shared.value > alpha: alpha = shared.value
+            gs.make_move(move)
+            turn_multiplier = 1 if gs.white_to_move else -1
+            if i == 0: score = -self.minimax(gs, depth - 1, -beta, -alpha, turn_multiplier, start_time, time_limit, 1)
+            else:
+                score = -self.minimax(gs, depth - 1, -alpha - 1, -alpha, turn_multiplier, start_time, time_limit, 1)
+                if alpha < score < beta: score = -self.minimax(gs, depth - 1, -beta, -alpha, turn_multiplier, start_time, time_limit, 1)
+            gs.undo_move()
+
+            if self.stop_requested or time.time() - start_time > time_limit: raise TimeoutError
+
+            if results is not None: results.append((move.move_id, score, alpha < score < beta))
+            if score > best_score: best_score = score; best_move = move
+            if score > alpha:
+                alpha = score; self.pv[0] = [move.move_id] + self.pv[1]
+                if alpha >= beta: break
+                if shared is not None:
+                    with shared.get_lock():
+                        if score > shared.value: shared.value = score
+        return best_move, best_score
+
+    def get_pool(self):
+        workers = max(1, self.search_workers)
+        settings = {name: getattr(self, name) for name in SEARCH_SETTINGS}
+        if self.pool is not None and (self.pool_size != workers or self.pool_settings != settings): self.close_pool()
+        if self.pool is None:
+            import multiprocessing  # yalnızca paralel aramada gerekir; motorun soğuk açılışını hızlı tutar
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: Qt iş parçacıkları olan süreci fork etmek yerine temiz süreçler
+            ctx = multiprocessing.get_context("spawn")
+            self.shared_alpha = ctx.Value('i', -self.CHECKMATE)  # işçiler arası ortak en iyi kök puanı
+            self.pool = ProcessPoolExecutor(workers, mp_context=ctx, initializer=_parallel_worker_init, initargs=(self.shared_alpha, settings))
+            self.pool_size = workers; self.pool_settings = settings
+        return self.pool
+
+    def close_pool(self):
+        if self.pool is not None: self.pool.shutdown(cancel_futures=True); self.pool = None; self.pool_size = 0; self.pool_settings = None
+
+    def find_best_move_parallel(self, gs, valid_moves, time_limit, fixed_depth=None):
+        # Kök bölme: her derinlikte kök hamleleri işçilere dağıtılır, her işçi kendi dilimini search_root (PVS) ile arar.
+        # Aspirasyon penceresi seri aramadaki gibidir; işçi beta'yı aşınca kendi içinde genişletir, bütün işçiler alpha'nın
+        # altında kalırsa (kesin puan yoksa) derinlik genişletilmiş alpha ile yeniden dağıtılır.
+        # Tek işçide aynı fonksiyon süreç içinde çalışır; karıştırma olmadığı için sonuç deterministiktir.
+        start_time = time.time()
+        total_nodes = 0
+        book_move = self.opening_book.get_book_move(gs, valid_moves)
+        if book_move: return book_move, 0.0, 1, 1
+        if not valid_moves: return None, 0.0, 0, 0
+
+        workers = max(1, min(self.search_workers, len(valid_moves)))
+        self.search_id += 1
+        if workers == 1: self.prepare_search()
+        self.nodes_visited = 0
+        # Tek işçide sayaçlar doğrudan bu nesnede artar; süreç havuzunda işçilerin farkları toplanır
+        worker_counters = (0,) * 8
+        self.telemetry.start(self.search_counters() if workers == 1 else worker_counters)
+        root = sorted(valid_moves, key=lambda m: (m.piece_captured == "--", m.move_id))
+        by_code = {m.move_id: m for m in root}
+        codes = [m.move_id for m in root]
+        limit_check = time_limit if time_limit else 999999
+        best_code, best_score = codes[0], -float('inf')
+        current_depth = 1
+        max_search_depth = min(fixed_depth, MAX_PLY - 1) if fixed_depth else 20
+        root_state = gs.snapshot()  # işçilere her derinlikte gönderilen küçük kopya
+
+        while current_depth <= max_search_depth:
+            if self.stop_requested or (time_limit and (time.time() - start_time > time_limit)): break
+            chunks = [codes[i::workers] for i in range(workers)]
+            delta = self.aspiration_window
+            if current_depth >= 3 and delta and abs(best_score) < MATE_THRESHOLD:
+                alpha, beta = max(-self.CHECKMATE, best_score - delta), min(self.CHECKMATE, best_score + delta)
+            else: alpha, beta = -self.CHECKMATE, self.CHECKMATE
+            while True:
+                if workers == 1:
+                    outcomes = [_parallel_search_moves(gs.snapshot(), chunks[0], current_depth, alpha, beta, start_time, limit_check, self.search_id, self)]
+                else:
+                    pool = self.get_pool()
+                    self.shared_alpha.value = -self.CHECKMATE
+                    futures = [pool.submit(_parallel_search_moves, root_state, chunk, current_depth, alpha, beta, start_time, limit_check, self.search_id)
+                               for chunk in chunks]
+                    outcomes = [f.result() for f in futures]
+                scores = {}; exact = set(); pvs = {}; complete = True
+                for results, pv, counters, done in outcomes:
+                    total_nodes += counters[0]; complete = complete and done
+                    worker_counters = tuple(a + b for a, b in zip(worker_counters, counters))
+                    if pv: pvs[pv[0]] = pv
+                    for code, score, is_exact in results:
+                        scores[code] = score
+                        if is_exact: exact.add(code)
+                if not complete or exact or alpha <= -self.CHECKMATE: break
+                delta *= 4; alpha = max(-self.CHECKMATE, max(scores.values()) - delta)  # hepsi alpha altında: pencere aşağı genişletilir
+            if not complete: break
+            # Yalnızca kesin puanlı hamleler puana göre öne alınır; alpha altında kalanların puanı üst sınırdır,
+            # bu yüzden onlar (ve eşit puanlılar) önceki derinliğin sırasını korur (kararlı sıralama)
+            codes.sort(key=lambda c: scores[c] if c in exact else -float('inf'), reverse=True)
+            best_code, best_score = codes[0], scores[codes[0]]
+            self.principal_variation = pvs.get(best_code, [best_code])
+            self.report_iteration(current_depth, by_code[best_code], best_score, None if workers == 1 else worker_counters)
+            if self.verbose: print(f"🔎 Derinlik {current_depth} ({workers} işçi): {by_code[best_code].get_chess_notation()} ({best_score:.2f})")
+            if time_limit and best_score > MATE_THRESHOLD: break
+            current_depth += 1
+
+        self.nodes_visited = total_nodes
+        return by_code[best_code], best_score, total_nodes, (current_depth - 1)
+
+    def minimax(self, gs, depth, alpha, beta, turn_multiplier, start_time, time_limit, ply=1, allow_null=True):
+        self.nodes_visited += 1
+        if self.nodes_visited % 1000 == 0:
+            if self.stop_requested or time.time() - start_time > time_limit: raise TimeoutError
+
+        self.pv[ply] = []
+        # Tekrar ve 50 hamle: arama içinde konumun bir kez tekrarı bile beraberlik sayılır, döngü açılmaz
+        if gs.halfmove_clock >= 4 and (gs.halfmove_clock >= 100 or gs.repetition_count(1)): return self.STALEMATE
+        # Son oyun bitbazı: en fazla üç taşlı konumda alt ağaç aranmaz; mat uzaklığı, aramada bulunan matların hemen altındaki banda çevrilir
+        if self.use_bitbases and self.bitbases.tables and sum(gs.piece_counts.values()) <= 3:
+            result = self.bitbases.probe(gs)
+            if result is not None:
+                outcome, distance = result
+                if outcome == 0: return self.STALEMATE
+                score = self.CHECKMATE - MAX_PLY - ply - distance
+                return score if outcome > 0 else -score
+        # Transpozisyon tablosu: yeterli derinlikte kayıt varsa kesme, yoksa hamle sıralaması.
+        # PV düğümlerinde (tam pencere) kesme yapılmaz: TT'den dönülürse ana varyantın devamı kaybolur.
+        alpha_orig = alpha
+        tt_move_id = None
+        entry = self.tt.probe(gs.zobrist_key)
+        if entry is not None:
+            tt_move_id = entry[4]
+            if entry[1] >= depth and beta - alpha == 1:
+                # Mat puanı TT'de bu düğüme göre saklanır; köke göre puana çevrilir
+                tt_score = entry[3]
+                if tt_score > MATE_THRESHOLD: tt_score -= ply
+                elif tt_score < -MATE_THRESHOLD: tt_score += ply
+                if entry[2] == TranspositionTable.EXACT: return tt_score
+                elif entry[2] == TranspositionTable.LOWER: alpha = max(alpha, tt_score)
+                else: beta = min(beta, tt_score)
+                if alpha >= beta: return tt_score
+
+        if depth <= 0:
+            if not self.use_quiescence: return turn_multiplier * self.score_board(gs)
+            self.quiescence_nodes_left = self.quiescence_node_limit
+            return self.quiescence(gs, alpha, beta, turn_multiplier, start_time, time_limit, ply)
+
+        # Boş hamle: sıra rakibe verilip azaltılmış derinlikte sıfır pencereyle aranır; yine de beta aşılıyorsa dal kesilir.
+        # PV düğümlerinde, üst üste, şah altında ve yalnızca piyon/şah kalan tarafta (zugzwang riski) yapılmaz.
+        if self.use_null_move and allow_null and depth >= self.null_move_min_depth and beta - alpha == 1 and abs(beta) < MATE_THRESHOLD:
+            side = 'w' if gs.white_to_move else 'b'; counts = gs.piece_counts
+            if counts[side + 'N'] + counts[side + 'B'] + counts[side + 'R'] + counts[side + 'Q'] and not gs.in_check():
+                reduction = self.null_move_reduction + (1 if depth > 6 else 0)
+                token = gs.make_null_move()
+                try: score = -self.minimax(gs, max(0, depth - 1 - reduction), -beta, -beta + 1, -turn_multiplier, start_time, time_limit, ply + 1, False)
+                finally: gs.undo_null_move(token)  # zaman aşımında da sıra geri verilir
+                if score >= beta: self.null_cutoffs += 1; return beta
+
+        valid_moves = gs.get_valid_move_codes()
+        # Mat puanı kökten uzaklıkla (ply) azalır: kalan derinlik budamalar yüzünden uzaklığı ölçmez
+        if not valid_moves: return -self.CHECKMATE + ply if gs.in_check_flag else self.STALEMATE
+        in_check = gs.in_check_flag
+        self.order_moves(gs, valid_moves, tt_move_id, ply)
+        self.expanded_nodes += 1
+        board = gs.board
+        killers = self.killers[ply] if ply < len(self.killers) else (None, None)
+        lmr = self.use_lmr and depth >= self._lmr_min_depth and not in_check; lmr_index = self._lmr_move_index
+
+        max_score = -self.CHECKMATE
+        best_move_id = None
+        for i, move in enumerate(valid_moves):
+            end = (move >> 6) & 63
+            # LMR adayı: geç sıralanmış, alış/terfi/katil olmayan sessiz hamle
+            reduce = lmr and i >= lmr_index and board[end >> 3][end & 7] == "--" and not move >> 15 \
+                and (move >> 12) & 7 != MOVE_EN_PASSANT and move != killers[0] and move != killers[1]
+            gs.make_move(move)
+            # PVS: ilk hamleden sonrakiler sıfır pencereyle; alpha'yı geçen hamle tam pencereyle yeniden aranır
+            if i == 0: score = -self.minimax(gs, depth - 1, -beta, -alpha, -turn_multiplier, start_time, time_limit, ply + 1)
+            else:
+                # LMR: şah çekmeyen aday önce azaltılmış derinlikte aranır; alpha'yı geçerse tam derinlikte yeniden aranır
+                reduced = reduce and not gs.in_check()
+                if reduced:
+                    reduction = 2 if depth >= 6 and i >= 2 * lmr_index else 1
+                    score = -self.minimax(gs, max(0, depth - 1 - reduction), -alpha - 1, -alpha, -turn_multiplier, start_time, time_limit, ply + 1)
+                    if score > alpha: self.lmr_researches += 1
+                if not reduced or score > alpha: score = -self.minimax(gs, depth - 1, -alpha - 1, -alpha, -turn_multiplier, start_time, time_limit, ply + 1)
+                if alpha < score < beta: score = -self.minimax(gs, depth - 1, -beta, -alpha, -turn_multiplier, start_time, time_limit, ply + 1)
+            gs.undo_move()
+            if score > max_score: max_score = score; best_move_id = move
+            if max_score > alpha:
+                alpha = max_score
+                self.pv[ply] = [move] + self.pv[ply + 1]
+            if alpha >= beta:
+                self.beta_cutoffs += 1
+                if i == 0: self.first_move_cutoffs += 1
+                self.record_cutoff(gs, move, depth, ply)
+                break
+
+        if max_score <= alpha_orig: flag = TranspositionTable.UPPER
+        elif max_score >= beta: flag = TranspositionTable.LOWER
+        else: flag = TranspositionTable.EXACT
+        stored = max_score + ply if max_score > MATE_THRESHOLD else max_score - ply if max_score < -MATE_THRESHOLD else max_score
+        self.tt.store(gs.zobrist_key, depth, flag, stored, best_move_id)
+        return max_score
+
+    def quiescence(self, gs, alpha, beta, turn_multiplier, start_time, time_limit, ply=1):
+        self.nodes_visited += 1
+        if self.nodes_visited % 1000 == 0:
+            if self.stop_requested or time.time() - start_time > time_limit: raise TimeoutError
+        self.quiescence_nodes_left -= 1
+
+        moves = gs.get_capture_move_codes()
+        if gs.in_check_flag:
+            # Şah altında "yerinde durma" yok: tüm kaçışlar aranır
+            if not moves: return -self.CHECKMATE + ply
+            best_score = -self.CHECKMATE + ply
+        else:
+            best_score = turn_multiplier * self.score_board(gs)  # stand-pat
+            if best_score >= beta or not moves or self.quiescence_nodes_left <= 0: return best_score
+            if best_score > alpha: alpha = best_score
+
+        self.order_moves(gs, moves, None, None)
+        for move in moves:
+            gs.make_move(move)
+            score = -self.quiescence(gs, -beta, -alpha, -turn_multiplier, start_time, time_limit, ply + 1)
+            gs.undo_move()
+            if score > best_score:
+                best_score = score
+                if score > alpha: alpha = score
+                if alpha >= beta: break
+        return best_score
+
+    def order_moves(self, gs, moves, tt_move, ply):
+        # Önce TT hamlesi, sonra MVV-LVA ile alışlar/terfiler, sonra katiller, en son geçmiş puanlı sessiz hamleler
+        board = gs.board; history = self.history
+        killer_1, killer_2 = self.killers[ply] if ply is not None and ply < len(self.killers) else (None, None)
+        def move_key(m):
+            if m == tt_move: return 1 << 30
+            end = (m >> 6) & 63; start = m & 63
+            victim = board[end >> 3][end & 7]; attacker = board[start >> 3][start & 7]
+            if victim != "--": return (1 << 24) + ORDER_VALUES[victim[1]] * 8 - ORDER_VALUES[attacker[1]] + (m >> 15)
+            if m >> 15 or (m >> 12) & 7 == MOVE_EN_PASSANT: return (1 << 24) + 8 - 1 + (m >> 15)
+            if m == killer_1: return (1 << 22) + 1
+            if m == killer_2: return 1 << 22
+            return min(history[attacker][end], (1 << 22) - 1)
+        moves.sort(key=move_key, reverse=True)
+
+    def record_cutoff(self, gs, move, depth, ply):
+        # Beta kesmesi yapan sessiz hamle: katil yuvasına ve geçmiş tablosuna yazılır
+        end = (move >> 6) & 63
+        if gs.board[end >> 3][end & 7] != "--" or move >> 15 or (move >> 12) & 7 == MOVE_EN_PASSANT: return
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+            if killers[0] != move: killers[1] = killers[0]; killers[0] = move
+        start = move & 63
+        self.history[gs.board[start >> 3][start & 7]][end] += depth * depth
+
+    def score_board(self, gs):
+        if gs.checkmate: return -self.CHECKMATE if gs.white_to_move else self.CHECKMATE
+        if gs.stalemate: return self.STALEMATE
+        # Materyal ve konum toplamları make_move/undo_move içinde artımlı tutulur; piyon yapısı piyon tablosundan gelir
+        score = gs.material_score + gs.position_score
+        if self.use_pawn_structure: score += self.pawn_table.probe(gs.pawn_key, gs.board)[1]
+        return score
+
+    def passed_pawns(self, gs):
+        # (beyaz, siyah) geçer piyon maskeleri; bit = satır * 8 + sütun
+        entry = self.pawn_table.probe(gs.pawn_key, gs.board)
+        return entry[2], entry[3]
+
+    def score_boards(self, boards, chunk_size=1 << 16):
+        # Toplu değerlendirme (NumPy): (N, 64) int8 taş kodları (PIECE_CODES sırası) ya da GameState.encode_board baytları.
+        # Mat/pat bayrakları dışında score_board ile birebir aynı puanı verir; bellek için chunk_size satırlık dilimlerle çalışır.
+        try: import numpy as np
+        except ImportError: raise ImportError("Toplu değerlendirme için NumPy gerekli: pip install numpy") from None
+        if not isinstance(boards, np.ndarray): boards = np.frombuffer(b"".join(boards), dtype=np.int8)
+        boards = boards.reshape(-1, 64)
+        # Taş kodu x kare tablosu: materyal + PST, beyaz +, siyah - (satır 0 boş kare)
+        table = np.zeros((len(PIECE_CODES), 64), dtype=np.int32)
+        for i, piece in enumerate(PIECE_CODES[1:], 1):
+            sign = 1 if piece[0] == 'w' else -1; pst = np.array(self.piece_position_scores[piece[1]], dtype=np.int32)
+            table[i] = sign * (self.piece_score[piece[1]] + (pst if sign == 1 else pst[::-1]).ravel())
+        flat = table.T.ravel(); offsets = np.arange(64, dtype=np.intp) * len(PIECE_CODES)
+        scores = np.empty(len(boards), dtype=np.int64)
+        for start in range(0, len(boards), chunk_size):
+            chunk = boards[start:start + chunk_size]
+            scores[start:start + len(chunk)] = flat[chunk.astype(np.intp) + offsets].sum(axis=1)
+            if self.use_pawn_structure: scores[start:start + len(chunk)] += _batch_pawn_scores(chunk)
+        return scores
+
+# --- PARALEL ARAMA İŞÇİLERİ (süreç havuzunda çalışır, bu yüzden modül seviyesinde) ---
+_worker_ai = None
+_worker_shared_alpha = None
+
+def _parallel_worker_init(shared_alpha=None, settings=None):
+    global _worker_ai, _worker_shared_alpha
+    _worker_ai = ChessAI(); _worker_shared_alpha = shared_alpha
+    for name, value in (settings or {}).items(): setattr(_worker_ai, name, value)  # ana süreçteki arama ayarları
+
+def _parallel_search_moves(gs, moves, depth, alpha, beta, start_time, time_limit, search_id, ai=None):
+    # Kök hamlelerinin bir dilimini search_root ile (alpha, beta) penceresinde arar; beta aşılırsa pencere yukarı genişletilip
+    # yeniden aranır. Sonuç (hamle, puan, kesin mi) listesi ve dilimin ana varyantı: pencere dışındaki puan yalnızca sınırdır.
+    # Zaman aşımında tamamlanmadı olarak döner. Sayaçlar (düğüm, kesme, TT) bu çağrıdaki farklar olarak geri verilir.
+    shared = _worker_shared_alpha if ai is None else None
+    ai = ai if ai is not None else _worker_ai
+    if ai.search_id != search_id: ai.search_id = search_id; ai.prepare_search()
+    before = ai.search_counters()
+    moves = [Move.from_code(code, gs.board) for code in moves]
+    results = []; delta = ai.aspiration_window or ai.CHECKMATE
+    try:
+        while True:
+            results = []
+            best_move, best_score = ai.search_root(gs, moves, depth, alpha, beta, start_time, time_limit, results, shared)
+            if best_score < beta or beta >= ai.CHECKMATE: break
+            delta *= 4; beta = min(ai.CHECKMATE, best_score + delta)
+    except TimeoutError:
+        return results, [], tuple(a - b for a, b in zip(ai.search_counters(), before)), False
+    return results, ai.pv[0][:], tuple(a - b for a, b in zip(ai.search_counters(), before)), True
+
+# ==========================================
+# 2. BÖLÜM: OYUN MOTORU
+# ==========================================
+# --- ROK HAKLARI (bit maskesi) ---
+CASTLE_WKS, CASTLE_WQS, CASTLE_BKS, CASTLE_BQS = 1, 2, 4, 8
+# Bir kareden çıkan ya da o kareye gelen hamle sonrası korunan haklar (şah ve köşe kaleleri)
+CASTLE_KEEP = [15] * 64
+CASTLE_KEEP[60] = 15 & ~(CASTLE_WKS | CASTLE_WQS); CASTLE_KEEP[56] = 15 & ~CASTLE_WQS; CASTLE_KEEP[63] = 15 & ~CASTLE_WKS
+CASTLE_KEEP[4] = 15 & ~(CASTLE_BKS | CASTLE_BQS); CASTLE_KEEP[0] = 15 & ~CASTLE_BQS; CASTLE_KEEP[7] = 15 & ~CASTLE_BKS
+
+# --- ZOBRIST ANAHTARLARI (sabit tohum: her süreçte aynı anahtarlar) ---
+_zobrist_rng = random.Random(20251)
+ZOBRIST_PIECES = {p: [_zobrist_rng.getrandbits(64) for _ in range(64)] for p in ("wP", "wN", "wB", "wR", "wQ", "wK", "bP", "bN", "bB", "bR", "bQ", "bK")}
+ZOBRIST_CASTLE = [_zobrist_rng.getrandbits(64) for _ in range(16)]
+ZOBRIST_BLACK = _zobrist_rng.getrandbits(64)
+ZOBRIST_EN_PASSANT = [_zobrist_rng.getrandbits(64) for _ in range(8)]
+
+# --- HAMLE KODLAMASI ---
+# Motor içinde hamle tek bir tam sayıdır: bit 0-5 çıkış karesi, 6-11 varış karesi, 12-14 bayrak, 15-17 terfi taşı
+MOVE_NORMAL, MOVE_CASTLE, MOVE_EN_PASSANT, MOVE_DOUBLE_PUSH = 0, 1, 2, 3
+PROMOTION_PIECES = ("", "N", "B", "R", "Q")
+SQUARE_NAMES = [f + r for r in "87654321" for f in "abcdefgh"]
+
+def encode_move(start_sq, end_sq, flag=MOVE_NORMAL, promotion=0):
+    return start_sq | (end_sq << 6) | (flag << 12) | (promotion << 15)
+
+def pawn_key_delta(piece, captured, start_sq, end_sq, captured_sq, promotion):
+    # Hamlenin piyon anahtarındaki XOR farkı; aynı fark geri almada da uygulanır
+    delta = 0
+    if piece[1] == 'P':
+        delta ^= ZOBRIST_PIECES[piece][start_sq]
+        if not promotion: delta ^= ZOBRIST_PIECES[piece][end_sq]
+    if captured[1] == 'P': delta ^= ZOBRIST_PIECES[captured][captured_sq]
+    return delta
+
+def move_uci(code):
+    return SQUARE_NAMES[code & 63] + SQUARE_NAMES[(code >> 6) & 63] + PROMOTION_PIECES[code >> 15].lower()
+
+# --- GERİ ALINAMAZ DURUM ---
+# Ply başına tek tam sayı: bit 0-3 rok hakları, 4-10 geçerken alma karesi + 1, 11-14 alınan taş, 15+ yarım hamle sayacı
+PIECE_CODES = ("--", "wP", "wN", "wB", "wR", "wQ", "wK", "bP", "bN", "bB", "bR", "bQ", "bK")
+PIECE_INDEX = {p: i for i, p in enumerate(PIECE_CODES)}
+STATE_STACK_SIZE = 256  # önceden ayrılan derinlik; uzun oyunlarda blok blok büyür
+
+CENTER_SQUARES = (27, 28, 35, 36)  # d5, e5, d4, e4
+CENTER_MASK = [sq in CENTER_SQUARES for sq in range(64)]
+
+class GameState:
+    DIRECTIONS = ((-1, 0), (0, -1), (1, 0), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+    KNIGHT_MOVES = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+
+    def __init__(self):
+        self.board = [
+            ["bR", "bN", "bB", "bQ", "bK", "bB", "bN", "bR"],
+            ["bP", "bP", "bP", "bP", "bP", "bP", "bP", "bP"],
+            ["--", "--", "--", "--", "--", "--", "--", "--"],
+            ["--", "--", "--", "--", "--", "--", "--", "--"],
+            ["--", "--", "--", "--", "--", "--", "--", "--"],
+            ["--", "--", "--", "--", "--", "--", "--", "--"],
+            ["wP", "wP", "wP", "wP", "wP", "wP", "wP", "wP"],
+            ["wR", "wN", "wB", "wQ", "wK", "wB", "wN", "wR"]
+        ]
+        self.white_to_move = True
+        self.move_log = []  # hamle kodları (int); görüntü için Move.from_code
+        self.white_king_location = (7, 4)
+        self.black_king_location = (0, 4)
+        self.checkmate = False; self.stalemate = False
+        self.in_check_flag = False; self.pins = {}; self.checks = []
+        self.en_passant_possible = -1  # geçerken alınabilecek kare, yoksa -1
+        self.castle_rights = CASTLE_WKS | CASTLE_WQS | CASTLE_BKS | CASTLE_BQS
+        self.halfmove_clock = 0
+        self.ply_offset = 0  # move_log'dan önce oynanmış yarım hamleler (FEN tam hamle numarası ve PGN numaralandırması için)
+        # make_move öncesi durum ve anahtar, ply indeksiyle (len(move_log)) saklanır
+        self.state_stack = [0] * STATE_STACK_SIZE
+        self.hash_stack = [0] * STATE_STACK_SIZE
+        self.zobrist_key = self.compute_zobrist()
+        self.pawn_key = self.compute_pawn_key()
+        self.compute_evaluation()
+
+    def compute_evaluation(self):
+        # Artımlı değerlendirme durumunun sıfırdan kurulması; sonrası make_move/undo_move farklarıyla
+        self.material_score = 0; self.position_score = 0
+        self.piece_counts = {c + t: 0 for c in "wb" for t in "PNBRQK"}
+        self.center_control = {'w': 0, 'b': 0}
+        for r in range(8):
+            for c in range(8):
+                p = self.board[r][c]
+                if p != "--":
+                    self.material_score += PIECE_MATERIAL[p]; self.position_score += PIECE_SQUARE_VALUES[p][r * 8 + c]
+                    self.piece_counts[p] += 1
+                    if CENTER_MASK[r * 8 + c]: self.center_control[p[0]] += 1
+
+    def compute_zobrist(self):
+        key = 0
+        for r in range(8):
+            for c in range(8):
+                p = self.board[r][c]
+                if p != "--": key ^= ZOBRIST_PIECES[p][r * 8 + c]
+        key ^= ZOBRIST_CASTLE[self.castle_rights]
+        if self.en_passant_possible != -1: key ^= ZOBRIST_EN_PASSANT[self.en_passant_possible & 7]
+        if not self.white_to_move: key ^= ZOBRIST_BLACK
+        return key
+
+    def compute_pawn_key(self):
+        # Piyon tablosu anahtarı: yalnızca piyonların Zobrist sayıları (sıra, rok ve geçerken alma yok)
+        key = 0
+        for r in range(8):
+            for c in range(8):
+                p = self.board[r][c]
+                if p == "wP" or p == "bP": key ^= ZOBRIST_PIECES[p][r * 8 + c]
+        return key
+
+    def encode_board(self):
+        # 64 baytlık tahta kodu (kare başına PIECE_CODES indeksi); ChessAI.score_boards ve toplu kayıtlar için
+        return bytes([PIECE_INDEX[p] for row in self.board for p in row])
+
+    def book_key(self):
+        # Açılış kitabı anahtarı: yalnızca taş yerleşimi ve sıra (rok/geçerken alma çıkarılır)
+        key = self.zobrist_key ^ ZOBRIST_CASTLE[self.castle_rights]
+        if self.en_passant_possible != -1: key ^= ZOBRIST_EN_PASSANT[self.en_passant_possible & 7]
+        return key
+
+    def clone(self):
+        return copy.deepcopy(self)
+
+    def snapshot(self):
+        # Arama için hafif kopya: tahta, artımlı değerlendirme ve yalnızca son geri alınamaz hamleden beri
+        # oynanan ply'lar (tekrar anahtarları). Maliyet oyunun uzunluğundan bağımsızdır; süreçlere de ucuz gönderilir.
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        ply = len(self.move_log); first = ply - min(ply, self.halfmove_clock)
+        new.board = [row[:] for row in self.board]
+        new.piece_counts = dict(self.piece_counts); new.center_control = dict(self.center_control)
+        new.pins = dict(self.pins); new.checks = list(self.checks)
+        new.move_log = self.move_log[first:]; new.ply_offset = self.ply_offset + first
+        new.state_stack = self.state_stack[first:ply] + [0] * STATE_STACK_SIZE
+        new.hash_stack = self.hash_stack[first:ply] + [0] * STATE_STACK_SIZE
+        return new
+
+    def load_fen(self, fen):
+        # Tam FEN: taş yerleşimi, sıra, rok hakları, geçerken alma karesi, yarım hamle sayacı ve tam hamle numarası.
+        # Son alanlar eksikse varsayılanlar kullanılır (EPD satırları dört alanlıdır); geçmiş sıfırlanır.
+        fields = fen.split()
+        rows = fields[0].split("/") if fields else []
+        if len(rows) != 8: raise ValueError(f"Geçersiz FEN: {fen}")
+        for r, row in enumerate(rows):
+            c = 0
+            for ch in row:
+                if ch.isdigit():
+                    if c + int(ch) > 8: raise ValueError(f"Geçersiz FEN (sıra 8 kareyi aşıyor): {fen}")
+                    for _ in range(int(ch)): self.board[r][c] = "--"; c += 1
+                else:
+                    piece = ('w' if ch.isupper() else 'b') + ch.upper()
+                    if piece not in ZOBRIST_PIECES or c > 7: raise ValueError(f"Geçersiz FEN: {fen}")
+                    self.board[r][c] = piece
+                    if piece == 'wK': self.white_king_location = (r, c)
+                    elif piece == 'bK': self.black_king_location = (r, c)
+                    c += 1
+            if c != 8: raise ValueError(f"Geçersiz FEN: {fen}")
+        if len(fields) > 1 and fields[1] not in ("w", "b"): raise ValueError(f"Geçersiz FEN: {fen}")
+        squares = [p for row in self.board for p in row]
+        if squares.count("wK") != 1 or squares.count("bK") != 1: raise ValueError(f"Geçersiz FEN (her tarafta tek şah olmalı): {fen}")
+        self.white_to_move = len(fields) < 2 or fields[1] == 'w'
+        # Sırası olmayan taraf şah altında olamaz; alt sınıfların bitboard'ları henüz eşlenmediği için tahta taraması kullanılır
+        king_row, king_col = self.black_king_location if self.white_to_move else self.white_king_location
+        if GameState.is_attacked(self, king_row, king_col, 'w' if self.white_to_move else 'b'):
+            raise ValueError(f"Geçersiz FEN (sırası olmayan taraf şah altında): {fen}")
+        rights = fields[2] if len(fields) > 2 else "-"
+        if rights != "-" and (not rights or any(ch not in "KQkq" for ch in rights)): raise ValueError(f"Geçersiz FEN: {fen}")
+        # Şahı ya da kalesi başlangıç karesinde olmayan rok hakkı düşürülür (yoksa rok tahtada olmayan kaleyi oynatır)
+        homes = ((CASTLE_WKS, 7, 7, 'w'), (CASTLE_WQS, 7, 0, 'w'), (CASTLE_BKS, 0, 7, 'b'), (CASTLE_BQS, 0, 0, 'b'))
+        self.castle_rights = sum(bit for ch, (bit, row, col, color) in zip("KQkq", homes)
+                                 if ch in rights and self.board[row][4] == color + 'K' and self.board[row][col] == color + 'R')
+        ep = fields[3] if len(fields) > 3 else "-"
+        if ep != "-" and ep not in SQUARE_NAMES: raise ValueError(f"Geçersiz FEN: {fen}")
+        self.en_passant_possible = SQUARE_NAMES.index(ep) if ep != "-" else -1
+        if self.en_passant_possible != -1:
+            # Geçerken alma karesi yalnızca doğru sıradaysa, önünde iki kare ilerlemiş rakip piyon duruyorsa ve kendisiyle
+            # arkasındaki kare boşsa kabul edilir; aksi halde alan yok sayılır
+            row, col = divmod(self.en_passant_possible, 8); forward = 1 if self.white_to_move else -1
+            enemy_pawn = 'bP' if self.white_to_move else 'wP'
+            if (row != (2 if self.white_to_move else 5) or self.board[row + forward][col] != enemy_pawn
+                    or self.board[row][col] != "--" or self.board[row - forward][col] != "--"):
+                self.en_passant_possible = -1
+        self.halfmove_clock = int(fields[4]) if len(fields) > 4 and fields[4].isdigit() else 0
+        fullmove = int(fields[5]) if len(fields) > 5 and fields[5].isdigit() else 1
+        self.ply_offset = (max(1, fullmove) - 1) * 2 + (0 if self.white_to_move else 1)
+        self.move_log = []
+        self.checkmate = False; self.stalemate = False
+        self.zobrist_key = self.compute_zobrist()
+        self.pawn_key = self.compute_pawn_key()
+        self.compute_evaluation()
+        return self
+
+    def generate_pgn(self):
+        # Numaralandırma FEN'deki tam hamle numarasından başlar; siyahla başlayan kayıt "N..." ile açılır
+        pgn = ""
+        for i, code in enumerate(self.move_log):
+            move = Move.from_code(code, self.board); ply = self.ply_offset + i
+            if ply % 2 == 0: pgn += f"{ply // 2 + 1}. {move.get_chess_notation()} "
+            elif i == 0: pgn += f"{ply // 2 + 1}... {move.get_chess_notation()} "
+            else: pgn += f"{move.get_chess_notation()} "
+        return pgn.strip()
+
+    def get_fen(self):
+        fen = "";
+        for r in range(8):
+            empty = 0
+            for c in range(8):
+                if self.board[r][c] == "--": empty += 1
+                else:
+                    if empty > 0: fen += str(empty); empty = 0
+                    color = self.board[r][c][0]; piece = self.board[r][c][1]
+                    fen += piece.upper() if color == 'w' else piece.lower()
+            if empty > 0: fen += str(empty)
+            if r < 7: fen += "/"
+        fen += " w " if self.white_to_move else " b "
+        fen += "".join(ch for ch, bit in zip("KQkq", (CASTLE_WKS, CASTLE_WQS, CASTLE_BKS, CASTLE_BQS)) if self.castle_rights & bit) or "-"
+        fen += " " + (SQUARE_NAMES[self.en_passant_possible] if self.en_passant_possible != -1 else "-")
+        fen += f" {self.halfmove_clock} {(self.ply_offset + len(self.move_log)) // 2 + 1}"
+        return fen
+
+    def get_san(self, code, valid_codes=None, check_suffix=True):
+        # Standart cebirsel gösterim (Nf3, exd5, O-O, e8=Q+); valid_codes verilmezse yasal hamleler üretilir
+        if valid_codes is None: valid_codes = self.get_valid_move_codes()
+        start = code & 63; end = (code >> 6) & 63; flag = (code >> 12) & 7
+        piece = self.board[start >> 3][start & 7]
+        if flag == MOVE_CASTLE: san = "O-O" if end > start else "O-O-O"
+        else:
+            capture = self.board[end >> 3][end & 7] != "--" or flag == MOVE_EN_PASSANT
+            if piece[1] == 'P': san = (SQUARE_NAMES[start][0] + "x" if capture else "") + SQUARE_NAMES[end]
+            else:
+                # Aynı türden başka bir taş da aynı kareye gidebiliyorsa sütun, gerekirse satır, gerekirse ikisi eklenir
+                rivals = [m & 63 for m in valid_codes if (m >> 6) & 63 == end and m & 63 != start and self.board[(m & 63) >> 3][m & 7] == piece]
+                prefix = ""
+                if rivals:
+                    if all((r & 7) != (start & 7) for r in rivals): prefix = SQUARE_NAMES[start][0]
+                    elif all((r >> 3) != (start >> 3) for r in rivals): prefix = SQUARE_NAMES[start][1]
+                    else: prefix = SQUARE_NAMES[start]
+                san = piece[1] + prefix + ("x" if capture else "") + SQUARE_NAMES[end]
+            if code >> 15: san += "=" + PROMOTION_PIECES[code >> 15]
+        if check_suffix:
+            self.make_move(code)
+            if self.in_check(): san += "#" if not self.get_valid_move_codes() else "+"
+            self.undo_move()
+        return san
+
+    def parse_san(self, text, valid_codes=None):
+        # SAN (ya da UCI) hamle metnini yasal hamle koduna çevirir; bulunamazsa None
+        if valid_codes is None: valid_codes = self.get_valid_move_codes()
+        text = text.strip().rstrip("+#!?").replace("0-0-0", "O-O-O").replace("0-0", "O-O")
+        for code in valid_codes:
+            if self.get_san(code, valid_codes, False) == text or move_uci(code) == text: return code
+        # Fazladan belirtilmiş çıkış karesi (Ng1f3) ya da '=' olmadan terfi (e8Q) gibi gevşek yazımlar
+        loose = text.replace("=", "").replace("x", "").replace("-", "")
+        for code in valid_codes:
+            start = code & 63; piece = self.board[start >> 3][start & 7][1]
+            target = SQUARE_NAMES[(code >> 6) & 63] + PROMOTION_PIECES[code >> 15]
+            if loose in ((piece if piece != 'P' else "") + SQUARE_NAMES[start] + target, SQUARE_NAMES[start] + target): return code
+        return None
+
+    def count_pieces(self):
+        return {p: n for p, n in self.piece_counts.items() if p[1] != 'K'}
+
+    def get_center_control(self):
+        return self.center_control['w'], self.center_control['b']
+
+    def make_move(self, move):
+        if move.__class__ is Move: move = move.move_id
+        start_sq = move & 63; end_sq = (move >> 6) & 63; flag = (move >> 12) & 7; promotion = move >> 15
+        start_row, start_col = start_sq >> 3, start_sq & 7; end_row, end_col = end_sq >> 3, end_sq & 7
+        board = self.board
+        piece = board[start_row][start_col]; captured = board[end_row][end_col]
+        # Zobrist anahtarı artımlı güncellenir; geri alma için eski anahtar saklanır
+        key = self.zobrist_key ^ ZOBRIST_BLACK ^ ZOBRIST_CASTLE[self.castle_rights] ^ ZOBRIST_PIECES[piece][start_sq]
+        if self.en_passant_possible != -1: key ^= ZOBRIST_EN_PASSANT[self.en_passant_possible & 7]
+        final_piece = piece[0] + PROMOTION_PIECES[promotion] if promotion else piece
+        # Materyal, konum, taş sayıları ve merkez kontrolü farklarla güncellenir
+        position = self.position_score - PIECE_SQUARE_VALUES[piece][start_sq] + PIECE_SQUARE_VALUES[final_piece][end_sq]
+        if CENTER_MASK[start_sq]: self.center_control[piece[0]] -= 1
+        if CENTER_MASK[end_sq]: self.center_control[piece[0]] += 1
+        if flag == MOVE_EN_PASSANT:
+            captured = board[start_row][end_col]; board[start_row][end_col] = "--"
+            captured_sq = start_row * 8 + end_col
+        else: captured_sq = end_sq
+        if captured != "--":
+            key ^= ZOBRIST_PIECES[captured][captured_sq]
+            self.material_score -= PIECE_MATERIAL[captured]; position -= PIECE_SQUARE_VALUES[captured][captured_sq]
+            self.piece_counts[captured] -= 1
+            if CENTER_MASK[captured_sq]: self.center_control[captured[0]] -= 1
+        if promotion:
+            self.material_score += PIECE_MATERIAL[final_piece] - PIECE_MATERIAL[piece]
+            self.piece_counts[piece] -= 1; self.piece_counts[final_piece] += 1
+        board[start_row][start_col] = "--"
+        board[end_row][end_col] = final_piece
+        key ^= ZOBRIST_PIECES[final_piece][end_sq]
+        if flag == MOVE_CASTLE:
+            rook = piece[0] + "R"; row = end_row * 8
+            if end_col - start_col == 2:
+                board[end_row][end_col-1] = rook; board[end_row][end_col+1] = "--"
+                key ^= ZOBRIST_PIECES[rook][row + 7] ^ ZOBRIST_PIECES[rook][row + 5]
+                position += PIECE_SQUARE_VALUES[rook][row + 5] - PIECE_SQUARE_VALUES[rook][row + 7]
+            else:
+                board[end_row][end_col+1] = rook; board[end_row][end_col-2] = "--"
+                key ^= ZOBRIST_PIECES[rook][row] ^ ZOBRIST_PIECES[rook][row + 3]
+                position += PIECE_SQUARE_VALUES[rook][row + 3] - PIECE_SQUARE_VALUES[rook][row]
+        self.position_score = position
+        if piece[1] == 'P' or captured[1] == 'P': self.pawn_key ^= pawn_key_delta(piece, captured, start_sq, end_sq, captured_sq, promotion)
+        # Geri alınamaz durum önceden ayrılmış yığına tek tam sayı olarak yazılır
+        ply = len(self.move_log)
+        if ply == len(self.state_stack): self.state_stack.extend([0] * STATE_STACK_SIZE); self.hash_stack.extend([0] * STATE_STACK_SIZE)
+        self.state_stack[ply] = self.castle_rights | (self.en_passant_possible + 1) << 4 | PIECE_INDEX[captured] << 11 | self.halfmove_clock << 15
+        self.hash_stack[ply] = self.zobrist_key
+        self.move_log.append(move)
+        self.halfmove_clock = 0 if piece[1] == 'P' or captured != "--" else self.halfmove_clock + 1
+        if flag == MOVE_DOUBLE_PUSH:
+            self.en_passant_possible = (start_sq + end_sq) >> 1
+            key ^= ZOBRIST_EN_PASSANT[start_col]
+        else: self.en_passant_possible = -1
+        self.castle_rights &= CASTLE_KEEP[start_sq] & CASTLE_KEEP[end_sq]
+        self.zobrist_key = key ^ ZOBRIST_CASTLE[self.castle_rights]
+        if piece == 'wK': self.white_king_location = (end_row, end_col)
+        elif piece == 'bK': self.black_king_location = (end_row, end_col)
+        self.white_to_move = not self.white_to_move
+
+    def make_null_move(self):
+        # Boş hamle (yalnızca arama için): sıra değişir, geçerken alma hakkı düşer; move_log ve yığınlara yazılmaz.
+        # Yarım hamle sayacı sıfırlanır, böylece tekrar taraması boş hamlenin ötesine bakmaz. Dönen değer undo_null_move içindir.
+        token = (self.en_passant_possible, self.halfmove_clock, self.zobrist_key)
+        key = self.zobrist_key ^ ZOBRIST_BLACK
+        if self.en_passant_possible != -1: key ^= ZOBRIST_EN_PASSANT[self.en_passant_possible & 7]
+        self.zobrist_key = key; self.en_passant_possible = -1; self.halfmove_clock = 0
+        self.white_to_move = not self.white_to_move
+        return token
+
+    def undo_null_move(self, token):
+        self.en_passant_possible, self.halfmove_clock, self.zobrist_key = token
+        self.white_to_move = not self.white_to_move
+
+    def undo_move(self):
+        if len(self.move_log) != 0:
+            move = self.move_log.pop()
+            state = self.state_stack[len(self.move_log)]; captured = PIECE_CODES[(state >> 11) & 15]
+            start_sq = move & 63; end_sq = (move >> 6) & 63; flag = (move >> 12) & 7
+            start_row, start_col = start_sq >> 3, start_sq & 7; end_row, end_col = end_sq >> 3, end_sq & 7
+            board = self.board
+            final_piece = board[end_row][end_col]
+            piece = final_piece[0] + 'P' if move >> 15 else final_piece
+            board[start_row][start_col] = piece
+            if flag == MOVE_EN_PASSANT: board[end_row][end_col] = "--"; board[start_row][end_col] = captured; captured_sq = start_row * 8 + end_col
+            else: board[end_row][end_col] = captured; captured_sq = end_sq
+            # make_move farklarının tersi
+            position = self.position_score + PIECE_SQUARE_VALUES[piece][start_sq] - PIECE_SQUARE_VALUES[final_piece][end_sq]
+            if CENTER_MASK[start_sq]: self.center_control[piece[0]] += 1
+            if CENTER_MASK[end_sq]: self.center_control[piece[0]] -= 1
+            if captured != "--":
+                self.material_score += PIECE_MATERIAL[captured]; position += PIECE_SQUARE_VALUES[captured][captured_sq]
+                self.piece_counts[captured] += 1
+                if CENTER_MASK[captured_sq]: self.center_control[captured[0]] += 1
+            if move >> 15:
+                self.material_score -= PIECE_MATERIAL[final_piece] - PIECE_MATERIAL[piece]
+                self.piece_counts[piece] += 1; self.piece_counts[final_piece] -= 1
+            self.white_to_move = not self.white_to_move
+            if piece == 'wK': self.white_king_location = (start_row, start_col)
+            elif piece == 'bK': self.black_king_location = (start_row, start_col)
+            if flag == MOVE_CASTLE:
+                rook = piece[0] + "R"; row = end_row * 8
+                if end_col - start_col == 2:
+                    board[end_row][end_col+1] = rook; board[end_row][end_col-1] = "--"
+                    position -= PIECE_SQUARE_VALUES[rook][row + 5] - PIECE_SQUARE_VALUES[rook][row + 7]
+                else:
+                    board[end_row][end_col-2] = rook; board[end_row][end_col+1] = "--"
+                    position -= PIECE_SQUARE_VALUES[rook][row + 3] - PIECE_SQUARE_VALUES[rook][row]
+            self.position_score = position
+            if piece[1] == 'P' or captured[1] == 'P': self.pawn_key ^= pawn_key_delta(piece, captured, start_sq, end_sq, captured_sq, move >> 15)
+            self.castle_rights = state & 15
+            self.en_passant_possible = ((state >> 4) & 127) - 1
+            self.halfmove_clock = state >> 15
+            self.zobrist_key = self.hash_stack[len(self.move_log)]
+            self.checkmate = False; self.stalemate = False
+
+    def repetition_count(self, limit=2):
+        # Aynı konumun (aynı sıra) daha önce kaç kez görüldüğü; yalnızca son geri alınamaz hamleye kadar geriye bakılır.
+        # hash_stack[i] i. hamleden önceki anahtardır; limit'e ulaşınca tarama durur.
+        key = self.zobrist_key; stack = self.hash_stack; ply = len(self.move_log)
+        count = 0
+        for i in range(ply - 4, max(0, ply - self.halfmove_clock) - 1, -2):
+            if stack[i] == key:
+                count += 1
+                if count >= limit: break
+        return count
+
+    def draw_by_rule(self):
+        # Kural gereği beraberlik nedeni (yoksa None): 50 hamle, üçlü tekrar, yetersiz materyal
+        if self.halfmove_clock >= 100: return "50 hamle kuralı"
+        if self.halfmove_clock >= 8 and self.repetition_count() >= 2: return "üçlü tekrar"
+        counts = self.piece_counts
+        if not any(counts[c + t] for c in "wb" for t in "PRQ") and counts['wN'] + counts['wB'] + counts['bN'] + counts['bB'] <= 1: return "yetersiz materyal"
+        return None
+
+    def captured_at(self, ply):
+        # ply numaralı hamlede alınan taş ("--" yoksa)
+        return PIECE_CODES[(self.state_stack[ply] >> 11) & 15]
+
+    def get_valid_moves(self):
+        # GUI ve PGN yolu için Move görünümleri; arama doğrudan get_valid_move_codes kullanır
+        return [Move.from_code(code, self.board) for code in self.get_valid_move_codes()]
+
+    def get_valid_move_codes(self):
+        # Şahlar ve açmazlar pozisyon başına bir kez hesaplanır; yalnızca yasal hamleler üretilir
+        self.in_check_flag, self.pins, self.checks = self.check_for_pins_and_checks()
+        if self.white_to_move: king_row, king_col = self.white_king_location
+        else: king_row, king_col = self.black_king_location
+        if self.in_check_flag:
+            if len(self.checks) == 1:
+                moves = self.get_all_possible_moves()
+                check_row, check_col, d_row, d_col = self.checks[0]
+                valid_squares = {check_row * 8 + check_col}
+                if self.board[check_row][check_col][1] != 'N':
+                    for i in range(1, 8):
+                        sq = (king_row + d_row * i) * 8 + king_col + d_col * i
+                        valid_squares.add(sq)
+                        if sq == check_row * 8 + check_col: break
+                king_sq = king_row * 8 + king_col
+                # Geçerken alma üretilirken zaten tam yasallık sınamasından geçer
+                moves = [m for m in moves if m & 63 == king_sq or ((m >> 6) & 63) in valid_squares or (m >> 12) & 7 == MOVE_EN_PASSANT]
+            else:
+                moves = []
+                self.get_king_moves(king_row, king_col, moves)
+        else:
+            moves = self.get_all_possible_moves()
+            self.get_castle_moves(king_row, king_col, moves)
+        if len(moves) == 0:
+            if self.in_check_flag: self.checkmate = True
+            else: self.stalemate = True
+        else: self.checkmate = False; self.stalemate = False
+        return moves
+
+    def get_capture_move_codes(self):
+        # Sükunet araması için: yalnızca yasal alışlar ve terfiler; şah altındaysa tüm kaçışlar
+        self.in_check_flag, self.pins, self.checks = self.check_for_pins_and_checks()
+        if self.in_check_flag: return self.get_valid_move_codes()
+        return self.get_all_possible_moves(captures_only=True)
+
+    def check_for_pins_and_checks(self):
+        pins = {}; checks = []
+        if self.white_to_move: enemy, ally = 'b', 'w'; king_row, king_col = self.white_king_location
+        else: enemy, ally = 'w', 'b'; king_row, king_col = self.black_king_location
+        pawn_dir = -1 if self.white_to_move else 1
+        for j, d in enumerate(self.DIRECTIONS):
+            possible_pin = None
+            for i in range(1, 8):
+                er, ec = king_row + d[0] * i, king_col + d[1] * i
+                if not (0 <= er < 8 and 0 <= ec < 8): break
+                p = self.board[er][ec]
+                if p == "--": continue
+                if p[0] == ally:
+                    if possible_pin is None: possible_pin = (er, ec)
+                    else: break
+                else:
+                    t = p[1]
+                    if (j < 4 and (t == 'R' or t == 'Q')) or (j >= 4 and (t == 'B' or t == 'Q')) or \
+                       (i == 1 and t == 'P' and j >= 4 and d[0] == pawn_dir):
+                        if possible_pin is None: checks.append((er, ec, d[0], d[1]))
+                        else: pins[possible_pin] = d
+                    break
+        for m in self.KNIGHT_MOVES:
+            er, ec = king_row + m[0], king_col + m[1]
+            if 0 <= er < 8 and 0 <= ec < 8 and self.board[er][ec] == enemy + 'N': checks.append((er, ec, m[0], m[1]))
+        return len(checks) > 0, pins, checks
+
+    def in_check(self):
+        if self.white_to_move: return self.square_under_attack(self.white_king_location[0], self.white_king_location[1])
+        else: return self.square_under_attack(self.black_king_location[0], self.black_king_location[1])
+
+    def square_under_attack(self, r, c):
+        return self.is_attacked(r, c, 'b' if self.white_to_move else 'w')
+
+    def is_attacked(self, r, c, attacker):
+        # Kareden dışarı ışın taraması: rakibin tüm hamlelerini üretmeye gerek yok
+        pawn_row = r + 1 if attacker == 'w' else r - 1
+        if 0 <= pawn_row < 8:
+            if c > 0 and self.board[pawn_row][c-1] == attacker + 'P': return True
+            if c < 7 and self.board[pawn_row][c+1] == attacker + 'P': return True
+        for m in self.KNIGHT_MOVES:
+            er, ec = r + m[0], c + m[1]
+            if 0 <= er < 8 and 0 <= ec < 8 and self.board[er][ec] == attacker + 'N': return True
+        for j, d in enumerate(self.DIRECTIONS):
+            for i in range(1, 8):
+                er, ec = r + d[0] * i, c + d[1] * i
+                if not (0 <= er < 8 and 0 <= ec < 8): break
+                p = self.board[er][ec]
+                if p == "--": continue
+                if p[0] == attacker:
+                    t = p[1]
+                    if t == 'Q' or (t == 'R' and j < 4) or (t == 'B' and j >= 4) or (t == 'K' and i == 1): return True
+                break
+        return False
+
+    def en_passant_is_legal(self, start_sq, end_sq):
+        # İki piyon birden kalktığı için açmaz/şah durumu doğrudan tahtada sınanır
+        board = self.board
+        start_row, start_col = start_sq >> 3, start_sq & 7; end_row, end_col = end_sq >> 3, end_sq & 7
+        pawn = board[start_row][start_col]; captured = board[start_row][end_col]
+        board[start_row][start_col] = "--"; board[start_row][end_col] = "--"; board[end_row][end_col] = pawn
+        king_row, king_col = self.white_king_location if pawn[0] == 'w' else self.black_king_location
+        legal = not self.is_attacked(king_row, king_col, captured[0])
+        board[start_row][start_col] = pawn; board[start_row][end_col] = captured; board[end_row][end_col] = "--"
+        return legal
+
+    def get_all_possible_moves(self, captures_only=False):
+        moves = []
+        for r in range(8):
+            for c in range(8):
+                turn = self.board[r][c][0]
+                if (turn == 'w' and self.white_to_move) or (turn == 'b' and not self.white_to_move):
+                    piece = self.board[r][c][1]
+                    if piece == 'P': self.get_pawn_moves(r, c, moves, captures_only)
+                    elif piece == 'R': self.get_rook_moves(r, c, moves, captures_only)
+                    elif piece == 'N': self.get_knight_moves(r, c, moves, captures_only)
+                    elif piece == 'B': self.get_bishop_moves(r, c, moves, captures_only)
+                    elif piece == 'Q': self.get_bishop_moves(r, c, moves, captures_only); self.get_rook_moves(r, c, moves, captures_only)
+                    elif piece == 'K': self.get_king_moves(r, c, moves, captures_only)
+        return moves
+
+    def add_pawn_move(self, start_sq, end_sq, moves, flag=MOVE_NORMAL):
+        if end_sq < 8 or end_sq >= 56:
+            for promotion in (4, 1, 2, 3): moves.append(start_sq | (end_sq << 6) | (promotion << 15))
+        else: moves.append(start_sq | (end_sq << 6) | (flag << 12))
+    def get_pawn_moves(self, r, c, moves, captures_only=False):
+        pin = self.pins.get((r, c))
+        if self.white_to_move: d_row, start_row, enemy = -1, 6, 'b'
+        else: d_row, start_row, enemy = 1, 1, 'w'
+        er = r + d_row
+        if not (0 <= er < 8): return
+        sq = r * 8 + c
+        if self.board[er][c] == "--" and (pin is None or pin[1] == 0) and (not captures_only or er == 0 or er == 7):
+            self.add_pawn_move(sq, er * 8 + c, moves)
+            if r == start_row and not captures_only and self.board[er + d_row][c] == "--": moves.append(sq | ((er + d_row) * 8 + c) << 6 | MOVE_DOUBLE_PUSH << 12)
+        for d_col in (-1, 1):
+            ec = c + d_col
+            if 0 <= ec < 8:
+                if self.board[er][ec][0] == enemy:
+                    if pin is None or pin == (d_row, d_col) or pin == (-d_row, -d_col): self.add_pawn_move(sq, er * 8 + ec, moves)
+                elif er * 8 + ec == self.en_passant_possible and self.en_passant_is_legal(sq, er * 8 + ec):
+                    moves.append(sq | (er * 8 + ec) << 6 | MOVE_EN_PASSANT << 12)
+    def get_rook_moves(self, r, c, moves, captures_only=False):
+        self.get_slider_moves(r, c, self.DIRECTIONS[:4], moves, captures_only)
+    def get_knight_moves(self, r, c, moves, captures_only=False):
+        if (r, c) in self.pins: return
+        enemy = "b" if self.white_to_move else "w"
+        sq = r * 8 + c
+        for m in self.KNIGHT_MOVES:
+            er, ec = r + m[0], c + m[1]
+            if 0 <= er < 8 and 0 <= ec < 8:
+                p = self.board[er][ec]
+                if (p == "--" and not captures_only) or p[0] == enemy: moves.append(sq | (er * 8 + ec) << 6)
+    def get_bishop_moves(self, r, c, moves, captures_only=False):
+        self.get_slider_moves(r, c, self.DIRECTIONS[4:], moves, captures_only)
+    def get_slider_moves(self, r, c, directions, moves, captures_only=False):
+        pin = self.pins.get((r, c))
+        enemy = "b" if self.white_to_move else "w"
+        sq = r * 8 + c
+        for d in directions:
+            if pin is not None and pin != d and pin != (-d[0], -d[1]): continue
+            for i in range(1, 8):
+                er, ec = r + d[0] * i, c + d[1] * i
+                if 0 <= er < 8 and 0 <= ec < 8:
+                    p = self.board[er][ec]
+                    if p == "--":
+                        if not captures_only: moves.append(sq | (er * 8 + ec) << 6)
+                    elif p[0] == enemy: moves.append(sq | (er * 8 + ec) << 6); break
+                    else: break
+                else: break
+    def get_king_moves(self, r, c, moves, captures_only=False):
+        enemy = "b" if self.white_to_move else "w"
+        king = self.board[r][c]; sq = r * 8 + c
+        self.board[r][c] = "--"  # şah kaldırılır ki kendi arkasındaki kareler saldırı altında görülsün
+        for m in self.DIRECTIONS:
+            er, ec = r + m[0], c + m[1]
+            if 0 <= er < 8 and 0 <= ec < 8:
+                p = self.board[er][ec]
+                if ((p == "--" and not captures_only) or p[0] == enemy) and not self.is_attacked(er, ec, enemy):
+                    moves.append(sq | (er * 8 + ec) << 6)
+        self.board[r][c] = king
+    def get_castle_moves(self, r, c, moves):
+        if self.in_check_flag: return
+        sq = r * 8 + c
+        if self.castle_rights & (CASTLE_WKS if self.white_to_move else CASTLE_BKS):
+            if self.board[r][c+1] == '--' and self.board[r][c+2] == '--':
+                if not self.square_under_attack(r, c+1) and not self.square_under_attack(r, c+2):
+                    moves.append(encode_move(sq, sq + 2, MOVE_CASTLE))
+        if self.castle_rights & (CASTLE_WQS if self.white_to_move else CASTLE_BQS):
+            if self.board[r][c-1] == '--' and self.board[r][c-2] == '--' and self.board[r][c-3] == '--':
+                if not self.square_under_attack(r, c-1) and not self.square_under_attack(r, c-2):
+                    moves.append(encode_move(sq, sq - 2, MOVE_CASTLE))
+
+class Move:
+    # Motor hamleleri int olarak taşır; bu sınıf yalnızca GUI ve PGN için hafif bir görünümdür
+    __slots__ = ("start_row", "start_col", "end_row", "end_col", "piece_moved", "piece_captured",
+                 "is_pawn_promotion", "promotion_piece", "is_castle_move", "is_enpassant_move", "move_id")
+
+    def __init__(self, start_sq, end_sq, board, promotion="Q"):
+        piece = board[start_sq[0]][start_sq[1]]; captured = board[end_sq[0]][end_sq[1]]
+        flag = MOVE_NORMAL
+        if piece[1] == 'K' and abs(end_sq[1] - start_sq[1]) == 2: flag = MOVE_CASTLE
+        elif piece[1] == 'P':
+            if start_sq[1] != end_sq[1] and captured == "--": flag = MOVE_EN_PASSANT
+            elif abs(end_sq[0] - start_sq[0]) == 2: flag = MOVE_DOUBLE_PUSH
+        promo = PROMOTION_PIECES.index(promotion) if piece[1] == 'P' and end_sq[0] in (0, 7) else 0
+        self.set_code(encode_move(start_sq[0] * 8 + start_sq[1], end_sq[0] * 8 + end_sq[1], flag, promo), board)
+
+    @classmethod
+    def from_code(cls, code, board):
+        move = cls.__new__(cls); move.set_code(code, board)
+        return move
+
+    def set_code(self, code, board):
+        self.start_row, self.start_col = divmod(code & 63, 8)
+        self.end_row, self.end_col = divmod((code >> 6) & 63, 8)
+        flag = (code >> 12) & 7
+        self.piece_moved = board[self.start_row][self.start_col]
+        self.piece_captured = board[self.end_row][self.end_col]
+        self.is_castle_move = flag == MOVE_CASTLE
+        self.is_enpassant_move = flag == MOVE_EN_PASSANT
+        if self.is_enpassant_move: self.piece_captured = ('b' if self.piece_moved[0] == 'w' else 'w') + 'P'
+        self.promotion_piece = PROMOTION_PIECES[code >> 15]
+        self.is_pawn_promotion = self.promotion_piece != ""
+        self.move_id = code
+
+    def __eq__(self, other): return isinstance(other, Move) and self.move_id == other.move_id
+    def get_chess_notation(self): return self.get_uci()[:4] + self.promotion_piece
+    def get_rank_file(self, r, c): return SQUARE_NAMES[r * 8 + c]
+    def get_uci(self): return SQUARE_NAMES[self.move_id & 63] + SQUARE_NAMES[(self.move_id >> 6) & 63] + self.promotion_piece.lower()
+
+# --- BITBOARD ARKA UCU ---
+# Kare indeksi = satır * 8 + sütun (a8 = 0, h1 = 63); her taş türü ve renk için bir 64 bitlik tam sayı
+BB_FULL = (1 << 64) - 1
+
+def _bb_leaper_table(offsets):
+    table = []
+    for sq in range(64):
+        r, c = divmod(sq, 8); b = 0
+        for dr, dc in offsets:
+            if 0 <= r + dr < 8 and 0 <= c + dc < 8: b |= 1 << ((r + dr) * 8 + c + dc)
+        table.append(b)
+    return table
+
+def _bb_ray_table(d):
+    table = []
+    for sq in range(64):
+        r, c = divmod(sq, 8); b = 0
+        r += d[0]; c += d[1]
+        while 0 <= r < 8 and 0 <= c < 8: b |= 1 << (r * 8 + c); r += d[0]; c += d[1]
+        table.append(b)
+    return table
+
+KNIGHT_ATTACKS = _bb_leaper_table(GameState.KNIGHT_MOVES)
+KING_ATTACKS = _bb_leaper_table(GameState.DIRECTIONS)
+PAWN_ATTACKS = {'w': _bb_leaper_table(((-1, -1), (-1, 1))), 'b': _bb_leaper_table(((1, -1), (1, 1)))}
+RAYS = [_bb_ray_table(d) for d in GameState.DIRECTIONS]
+# Artan kare yönünde en yakın engel en düşük bit, azalan yönde en yüksek bittir
+RAY_POSITIVE = [d[0] * 8 + d[1] > 0 for d in GameState.DIRECTIONS]
+OPPOSITE_DIR = [GameState.DIRECTIONS.index((-d[0], -d[1])) for d in GameState.DIRECTIONS]
+
+def bb_ray_attacks(sq, occ, j):
+    ray = RAYS[j][sq]
+    blockers = ray & occ
+    if blockers:
+        first = (blockers & -blockers).bit_length() - 1 if RAY_POSITIVE[j] else blockers.bit_length() - 1
+        ray ^= RAYS[j][first]
+    return ray
+
+def bb_rook_attacks(sq, occ):
+    return bb_ray_attacks(sq, occ, 0) | bb_ray_attacks(sq, occ, 1) | bb_ray_attacks(sq, occ, 2) | bb_ray_attacks(sq, occ, 3)
+
+def bb_bishop_attacks(sq, occ):
+    return bb_ray_attacks(sq, occ, 4) | bb_ray_attacks(sq, occ, 5) | bb_ray_attacks(sq, occ, 6) | bb_ray_attacks(sq, occ, 7)
+
+class BitboardGameState(GameState):
+    # Aynı make_move/undo_move/get_valid_moves arayüzü; tahta listesi GUI için eşzamanlı tutulur
+    def __init__(self):
+        super().__init__()
+        self.sync_bitboards()
+
+    def load_fen(self, fen):
+        super().load_fen(fen)
+        self.sync_bitboards()
+        return self
+
+    def snapshot(self):
+        new = super().snapshot()
+        new.bitboards = dict(self.bitboards); new.occupancy = dict(self.occupancy)
+        return new
+
+    def sync_bitboards(self):
+        self.bitboards = {p: 0 for p in ZOBRIST_PIECES}
+        self.occupancy = {'w': 0, 'b': 0}
+        for r in range(8):
+            for c in range(8):
+                p = self.board[r][c]
+                if p != "--": self.bitboards[p] |= 1 << (r * 8 + c); self.occupancy[p[0]] |= 1 << (r * 8 + c)
+
+    def toggle_move_bits(self, move, final_piece, captured):
+        # XOR ile uygulanır: aynı çağrı hamleyi hem yapar hem geri alır
+        bb = self.bitboards; occ = self.occupancy
+        start_sq = move & 63; end_sq = (move >> 6) & 63; flag = (move >> 12) & 7
+        from_bit = 1 << start_sq; to_bit = 1 << end_sq
+        color = final_piece[0]
+        bb[color + 'P' if move >> 15 else final_piece] ^= from_bit; bb[final_piece] ^= to_bit; occ[color] ^= from_bit | to_bit
+        if captured != "--":
+            captured_bit = 1 << ((start_sq & 56) | (end_sq & 7)) if flag == MOVE_EN_PASSANT else to_bit
+            bb[captured] ^= captured_bit; occ[captured[0]] ^= captured_bit
+        elif flag == MOVE_CASTLE:
+            row = end_sq & 56
+            rook_bits = (1 << (row + 7)) | (1 << (row + 5)) if end_sq > start_sq else (1 << row) | (1 << (row + 3))
+            bb[color + 'R'] ^= rook_bits; occ[color] ^= rook_bits
+
+    def make_move(self, move):
+        super().make_move(move)
+        ply = len(self.move_log) - 1; code = self.move_log[ply]; end_sq = (code >> 6) & 63
+        self.toggle_move_bits(code, self.board[end_sq >> 3][end_sq & 7], self.captured_at(ply))
+
+    def undo_move(self):
+        if len(self.move_log) != 0:
+            ply = len(self.move_log) - 1; code = self.move_log[ply]; end_sq = (code >> 6) & 63
+            self.toggle_move_bits(code, self.board[end_sq >> 3][end_sq & 7], self.captured_at(ply))
+            super().undo_move()
+
+    def attacked_by(self, sq, attacker, occ):
+        bb = self.bitboards
+        if PAWN_ATTACKS['b' if attacker == 'w' else 'w'][sq] & bb[attacker + 'P']: return True
+        if KNIGHT_ATTACKS[sq] & bb[attacker + 'N']: return True
+        if KING_ATTACKS[sq] & bb[attacker + 'K']: return True
+        rooks = bb[attacker + 'R'] | bb[attacker + 'Q']
+        if rooks and bb_rook_attacks(sq, occ) & rooks: return True
+        bishops = bb[attacker + 'B'] | bb[attacker + 'Q']
+        if bishops and bb_bishop_attacks(sq, occ) & bishops: return True
+        return False
+
+    def is_attacked(self, r, c, attacker):
+        return self.attacked_by(r * 8 + c, attacker, self.occupancy['w'] | self.occupancy['b'])
+
+    def check_for_pins_and_checks(self):
+        pins = {}; checks = []; bb = self.bitboards
+        if self.white_to_move: ally, enemy = 'w', 'b'; king_row, king_col = self.white_king_location
+        else: ally, enemy = 'b', 'w'; king_row, king_col = self.black_king_location
+        king_sq = king_row * 8 + king_col
+        occ = self.occupancy['w'] | self.occupancy['b']
+        leapers = (PAWN_ATTACKS[ally][king_sq] & bb[enemy + 'P']) | (KNIGHT_ATTACKS[king_sq] & bb[enemy + 'N'])
+        while leapers:
+            low = leapers & -leapers; leapers ^= low
+            r, c = divmod(low.bit_length() - 1, 8); checks.append((r, c, r - king_row, c - king_col))
+        straight = bb[enemy + 'R'] | bb[enemy + 'Q']; diagonal = bb[enemy + 'B'] | bb[enemy + 'Q']
+        for j in range(8):
+            sliders = straight if j < 4 else diagonal
+            if not sliders & RAYS[j][king_sq]: continue
+            blockers = RAYS[j][king_sq] & occ
+            first = (blockers & -blockers).bit_length() - 1 if RAY_POSITIVE[j] else blockers.bit_length() - 1
+            if (1 << first) & sliders:
+                r, c = divmod(first, 8); checks.append((r, c) + GameState.DIRECTIONS[j])
+            elif (1 << first) & self.occupancy[ally]:
+                blockers &= RAYS[j][first]
+                if blockers:
+                    second = (blockers & -blockers).bit_length() - 1 if RAY_POSITIVE[j] else blockers.bit_length() - 1
+                    if (1 << second) & sliders: pins[divmod(first, 8)] = GameState.DIRECTIONS[j]
+        return len(checks) > 0, pins, checks
+
+    def en_passant_is_legal(self, start_sq, end_sq):
+        ally = 'w' if self.white_to_move else 'b'; enemy = 'b' if ally == 'w' else 'w'
+        captured_bit = 1 << ((start_sq & 56) | (end_sq & 7))
+        occ = (self.occupancy['w'] | self.occupancy['b']) ^ (1 << start_sq) ^ (1 << end_sq) ^ captured_bit
+        king_row, king_col = self.white_king_location if ally == 'w' else self.black_king_location
+        self.bitboards[enemy + 'P'] ^= captured_bit
+        legal = not self.attacked_by(king_row * 8 + king_col, enemy, occ)
+        self.bitboards[enemy + 'P'] ^= captured_bit
+        return legal
+
+    def get_all_possible_moves(self, captures_only=False):
+        moves = []; bb = self.bitboards
+        if self.white_to_move: ally, enemy, push = 'w', 'b', -8; start_rank = 0x00FF000000000000; king_row, king_col = self.white_king_location
+        else: ally, enemy, push = 'b', 'w', 8; start_rank = 0x000000000000FF00; king_row, king_col = self.black_king_location
+        own = self.occupancy[ally]; opp = self.occupancy[enemy]; occ = own | opp
+        king_sq = king_row * 8 + king_col
+        pin_masks = {}
+        for (r, c), d in self.pins.items():
+            j = GameState.DIRECTIONS.index(d)
+            pin_masks[r * 8 + c] = RAYS[j][king_sq] | RAYS[OPPOSITE_DIR[j]][king_sq]
+        ep_bit = 1 << self.en_passant_possible if self.en_passant_possible != -1 else 0
+        target_mask = opp if captures_only else ~own
+        promotion_rank = 0xFF if self.white_to_move else 0xFF00000000000000
+        for piece in ('P', 'N', 'B', 'R', 'Q'):
+            pieces = bb[ally + piece]
+            while pieces:
+                low = pieces & -pieces; sq = low.bit_length() - 1; pieces ^= low
+                if piece == 'P':
+                    targets = PAWN_ATTACKS[ally][sq] & opp
+                    one = sq + push
+                    if not (1 << one) & occ and (not captures_only or (1 << one) & promotion_rank):
+                        targets |= 1 << one
+                        if low & start_rank and not captures_only and not (1 << (one + push)) & occ:
+                            if sq not in pin_masks or pin_masks[sq] & (1 << (one + push)): moves.append(sq | (one + push) << 6 | MOVE_DOUBLE_PUSH << 12)
+                    if sq in pin_masks: targets &= pin_masks[sq]
+                    if PAWN_ATTACKS[ally][sq] & ep_bit and self.en_passant_is_legal(sq, self.en_passant_possible):
+                        moves.append(sq | self.en_passant_possible << 6 | MOVE_EN_PASSANT << 12)
+                    while targets:
+                        t_low = targets & -targets; targets ^= t_low
+                        self.add_pawn_move(sq, t_low.bit_length() - 1, moves)
+                    continue
+                elif piece == 'N': targets = KNIGHT_ATTACKS[sq] & target_mask
+                elif piece == 'B': targets = bb_bishop_attacks(sq, occ) & target_mask
+                elif piece == 'R': targets = bb_rook_attacks(sq, occ) & target_mask
+                else: targets = (bb_rook_attacks(sq, occ) | bb_bishop_attacks(sq, occ)) & target_mask
+                if sq in pin_masks: targets &= pin_masks[sq]
+                while targets:
+                    t_low = targets & -targets; targets ^= t_low
+                    moves.append(sq | (t_low.bit_length() - 1) << 6)
+        self.get_king_moves(king_row, king_col, moves, captures_only)
+        return moves
+
+    def get_king_moves(self, r, c, moves, captures_only=False):
+        ally, enemy = ('w', 'b') if self.white_to_move else ('b', 'w')
+        sq = r * 8 + c
+        occ = (self.occupancy['w'] | self.occupancy['b']) ^ (1 << sq)  # şah kaldırılmış doluluk
+        targets = KING_ATTACKS[sq] & (self.occupancy[enemy] if captures_only else ~self.occupancy[ally])
+        while targets:
+            low = targets & -targets; targets ^= low; t = low.bit_length() - 1
+            if not self.attacked_by(t, enemy, occ): moves.append(sq | t << 6)
+
+# Konum gösterimleri: perft, UCI (Backend seçeneği) ve komut satırı araçlarının --backend bayrağı bu adlarla seçer
+BACKENDS = {"mailbox": GameState, "bitboard": BitboardGameState}
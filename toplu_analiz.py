@@ -0,0 +1,140 @@
+﻿import os
+import sys
+import json
+import time
+import random
+import argparse
+from collections import deque
+from satranc_motoru import ChessAI, OpeningBook, BACKENDS, move_uci
+from epd_testi import parse_epd
+
+# ==========================================
+# TOPLU ANALİZ: FEN/EPD AKIŞI -> JSONL SONUÇLAR
+# ==========================================
+# Konumlar dosyadan ya da stdin'den satır satır okunur, sınırlı sayıda iş süreç havuzunda bekler; bellek girdi boyutundan bağımsızdır.
+# Satır: tam FEN ya da EPD (id işlemi varsa kimlik odur, yoksa satır numarası). Çıktı: konum başına bir JSON satırı
+# (id, fen, move, san, score [sıradaki tarafa göre], depth, nodes, time, pv). Geçersiz konumda yalnızca error yazılır:
+# çözülemeyen satır, her tarafta tek şah olmayan ya da sırası olmayan tarafı şah altında bırakan FEN (GameState.load_fen);
+# analiz sırasında çıkan her hata da o konumun error kaydı olur, çalışma sürer.
+# Çıktı dosyası varsa yazılmış kimlikler atlanır (çökme sonrası devam); yarım kalan son satır kesilir.
+# Kullanım:
+#   python toplu_analiz.py konumlar.epd -o sonuclar.jsonl --time 1 --workers 4
+#   cat konumlar.fen | python toplu_analiz.py - --depth 5 --unordered --backend bitboard
+
+def parse_line(line, number):
+    # (kimlik, FEN); altı alanlı FEN olduğu gibi, diğerleri EPD olarak okunur
+    fields = line.split(";")[0].split()
+    if ";" not in line and len(fields) == 6 and fields[4].isdigit() and fields[5].isdigit(): return str(number), line
+    fen, operations = parse_epd(line)
+    return operations.get("id", [str(number)])[0], fen
+
+def read_positions(stream, done):
+    # Tembel okuma: boş, '#' ve daha önce yazılmış kimlikli satırlar atlanır
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"): continue
+        try: position_id, fen = parse_line(line, number)
+        except ValueError: position_id, fen = str(number), line
+        if position_id not in done: yield position_id, fen
+
+def load_done(filename):
+    # Yazılmış kimlikler; çökmede yarım kalan son satır dosyadan kesilir
+    done = set()
+    if not filename or not os.path.exists(filename): return done
+    with open(filename, "rb+") as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"): break
+            try: done.add(json.loads(line)["id"])
+            except (ValueError, KeyError): break
+            valid_end += len(line)
+        f.truncate(valid_end)
+    return done
+
+_worker_ai = None
+
+def _worker_init(use_book=False):
+    global _worker_ai
+    _worker_ai = ChessAI(); _worker_ai.verbose = False
+    if not use_book: _worker_ai.opening_book.close(); _worker_ai.opening_book = OpeningBook("")
+
+def analyse(position_id, fen, time_limit, fixed_depth, backend="mailbox", ai=None):
+    # Konumdaki her hata (geçersiz FEN ya da arama sırasında beklenmeyen durum) error kaydına dönüşür; tek konum çalışmayı durduramaz
+    try: return analyse_position(position_id, fen, time_limit, fixed_depth, backend, ai if ai is not None else _worker_ai)
+    except Exception as e: return {"id": position_id, "fen": fen, "error": str(e) or type(e).__name__}
+
+def analyse_position(position_id, fen, time_limit, fixed_depth, backend, ai):
+    # Tek konum; boş TT ve geçmiş tablosuyla, kök karıştırması FEN'e göre tohumlanarak aranır: devam edilen çalışma aynı sonuçları verir
+    gs = BACKENDS[backend]().load_fen(fen)
+    valid_moves = gs.get_valid_moves()
+    if not valid_moves:
+        return {"id": position_id, "fen": fen, "move": None, "san": None, "score": -ai.CHECKMATE if gs.checkmate else ai.STALEMATE,
+                "depth": 0, "nodes": 0, "time": 0.0, "pv": []}
+    ai.tt.clear()
+    for table in ai.history.values(): table[:] = [0] * 64
+    random.seed(fen)
+    start = time.perf_counter()
+    best_move, score, nodes, depth = ai.find_best_move_smart(gs, valid_moves, time_limit, fixed_depth)
+    elapsed = time.perf_counter() - start
+    pv = [move_uci(code) for code in ai.principal_variation] or [best_move.get_uci()]
+    return {"id": position_id, "fen": fen, "move": best_move.get_uci(), "san": gs.get_san(best_move.move_id),
+            "score": score if abs(score) != float('inf') else 0, "depth": depth, "nodes": nodes, "time": round(elapsed, 4), "pv": pv}
+
+def run_pipeline(positions, time_limit, fixed_depth, workers, write, ordered=True, use_book=False, backend="mailbox"):
+    # Havuzda en fazla 2 * workers iş bekler. Sıralı modda sonuçlar girdi sırasıyla yazılır (baştaki iş bitene kadar yenisi gönderilmez);
+    # sırasız modda biten sonuç hemen yazılır. Dönüş: yazılan sonuç sayısı.
+    count = 0
+    if workers <= 1:
+        _worker_init(use_book)
+        for position_id, fen in positions:
+            write(analyse(position_id, fen, time_limit, fixed_depth, backend)); count += 1
+        return count
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    window = 2 * workers
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"), initializer=_worker_init, initargs=(use_book,)) as pool:
+        pending = deque()
+        for position_id, fen in positions:
+            pending.append(pool.submit(analyse, position_id, fen, time_limit, fixed_depth, backend))
+            while len(pending) >= window:
+                if ordered: finished = [pending.popleft()]
+                else:
+                    finished = wait(pending, return_when=FIRST_COMPLETED).done
+                    pending = deque(f for f in pending if f not in finished)
+                for future in finished: write(future.result()); count += 1
+        for future in pending: write(future.result()); count += 1
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FEN/EPD konumlarını akış halinde, paralel analiz eder; sonuçlar JSONL olarak yazılır.")
+    parser.add_argument("input", help="Konum dosyası (satır başına FEN/EPD); '-' stdin")
+    parser.add_argument("-o", "--output", help="JSONL çıktı dosyası (varsa kaldığı yerden devam edilir); verilmezse stdout")
+    parser.add_argument("--time", type=float, help="Konum başına süre (saniye)")
+    parser.add_argument("--depth", type=int, help="Konum başına sabit derinlik")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Paralel analiz sayısı")
+    parser.add_argument("--unordered", action="store_true", help="Sonuçları bitiş sırasıyla yaz (kimlik alanıyla eşleştirilir)")
+    parser.add_argument("--book", action="store_true", help="Açılış kitabı hamlelerini kullan")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="mailbox", help="Aramada kullanılan konum gösterimi")
+    args = parser.parse_args(argv)
+    if args.time is None and args.depth is None: args.time = 1.0
+    done = load_done(args.output)
+    if done: print(f"↩️ {len(done)} konum zaten analiz edilmiş, atlanıyor.", file=sys.stderr)
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    out = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter(); total_nodes = 0; errors = 0
+
+    def write(result):
+        nonlocal total_nodes, errors
+        out.write(json.dumps(result, ensure_ascii=False) + "\n"); out.flush()  # satır satır: çökmede en fazla son satır yarım kalır
+        total_nodes += result.get("nodes", 0); errors += "error" in result
+    try: count = run_pipeline(read_positions(source, done), args.time, args.depth, max(1, args.workers), write, not args.unordered, args.book, args.backend)
+    finally:
+        if source is not sys.stdin: source.close()
+        if out is not sys.stdout: out.close()
+    elapsed = time.perf_counter() - start
+    print(f"✅ {count} konum, {total_nodes:,} düğüm, {elapsed:.1f}s ({count / elapsed if elapsed else 0:.2f} konum/s)"
+          + (f", {errors} geçersiz konum" if errors else ""), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
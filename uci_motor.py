@@ -0,0 +1,153 @@
+﻿import sys
+import time
+import threading
+from satranc_motoru import ChessAI, Move, MAX_PLY, BACKENDS
+
+# ==========================================
+# UCI MOTORU: ARAYÜZSÜZ STDIN/STDOUT GİRİŞ NOKTASI
+# ==========================================
+# Turnuva yöneticileri (cutechess, Arena) ve toplu işler için; PyQt6 yüklenmez.
+# Desteklenen komutlar: uci, isready, ucinewgame, position, go (depth/movetime/wtime/btime/winc/binc/movestogo/infinite/ponder), ponderhit, stop, quit
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+class UCIEngine:
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self.ai = ChessAI(); self.ai.verbose = False
+        self.ai.on_iteration = self.send_iteration
+        self.backend = "mailbox"; self.gs = BACKENDS[self.backend]()
+        self.search_thread = None; self.search_unbounded = False
+        # Ponder: "go ponder" süresiz arar; "ponderhit" gelince aynı arama hesaplanan süreyle sınırlanır
+        self.pondering = False; self.ponder_time_limit = None; self.ponder_timer = None
+        self.ponder_release = threading.Event()
+
+    def send(self, text):
+        self.out.write(text + "\n"); self.out.flush()
+
+    def handle(self, line):
+        # Komutu işler; "quit" gelince False döner
+        parts = line.split()
+        if not parts: return True
+        cmd = parts[0]
+        if cmd == "uci":
+            self.send("id name Yapay-zeka"); self.send("id author AhmetBugra46")
+            self.send("option name Ponder type check default false")
+            self.send("option name NullMove type check default true"); self.send("option name LMR type check default true")
+            self.send("option name Backend type combo default mailbox " + " ".join(f"var {name}" for name in BACKENDS))
+            self.send("option name TelemetryFile type string default <empty>"); self.send("uciok")
+        elif cmd == "isready": self.send("readyok")
+        elif cmd == "ucinewgame":
+            self.stop(); self.ai.tt.clear(); self.gs = BACKENDS[self.backend]()
+        elif cmd == "position": self.stop(); self.set_position(parts[1:])
+        elif cmd == "go": self.stop(); self.go(parts[1:])
+        elif cmd == "ponderhit": self.ponder_hit()
+        elif cmd == "setoption": self.set_option(parts[1:])
+        elif cmd == "stop": self.stop()
+        elif cmd == "quit":
+            self.stop(); self.ai.close_pool()
+            return False
+        return True
+
+    def set_option(self, args):
+        # setoption name <ad> value <değer>
+        if "name" not in args: return
+        value_at = args.index("value") if "value" in args else len(args)
+        name = " ".join(args[args.index("name") + 1:value_at]).lower(); value = " ".join(args[value_at + 1:])
+        if name == "telemetryfile": self.ai.telemetry.jsonl_file = value if value and value != "<empty>" else None
+        elif name == "nullmove": self.ai.use_null_move = value.lower() == "true"
+        elif name == "lmr": self.ai.use_lmr = value.lower() == "true"
+        elif name == "backend":
+            if value.lower() in BACKENDS: self.backend = value.lower()  # sonraki "position"/"ucinewgame" ile geçerli olur
+            else: self.send(f"info string Bilinmeyen backend: {value}")
+
+    def format_score(self, score):
+        # Köke MAX_PLY yarım hamleden yakın mat puanı "mate N" (N hamle, eksi: motor mat oluyor), diğerleri "cp"
+        if abs(score) == float('inf'): return "cp 0"
+        score = int(score); plies = self.ai.CHECKMATE - abs(score)
+        if plies < MAX_PLY: return f"mate {(plies + 1) // 2 if score > 0 else -(plies // 2)}"
+        return f"cp {score}"
+
+    def send_iteration(self, entry):
+        self.send(f"info depth {entry['depth']} score {self.format_score(entry['score'])} nodes {entry['nodes']} nps {entry['nps']} time {int(entry['elapsed'] * 1000)} pv {' '.join(entry['pv'])}")
+
+    def set_position(self, args):
+        if not args: return
+        if args[0] == "startpos": fen = START_FEN; rest = args[1:]
+        elif args[0] == "fen":
+            end = args.index("moves") if "moves" in args else len(args)
+            fen = " ".join(args[1:end]); rest = args[end:]
+        else: return
+        try: gs = BACKENDS[self.backend]().load_fen(fen)
+        except ValueError as e:
+            self.send(f"info string {e}"); return
+        for uci in rest[1:] if rest and rest[0] == "moves" else []:
+            move = next((m for m in gs.get_valid_moves() if m.get_uci() == uci), None)
+            if move is None:
+                self.send(f"info string Geçersiz hamle: {uci}"); break
+            gs.make_move(move)
+        self.gs = gs
+
+    def go(self, args):
+        options = {}; i = 0
+        while i < len(args):
+            if args[i] in ("depth", "movetime", "wtime", "btime", "winc", "binc", "movestogo") and i + 1 < len(args):
+                try: options[args[i]] = int(args[i + 1])
+                except ValueError: pass  # "go depth x" gibi bozuk değer yok sayılır
+                i += 2
+            else: options[args[i]] = True; i += 1
+
+        fixed_depth = options.get("depth"); time_limit = None
+        if "movetime" in options: time_limit = options["movetime"] / 1000
+        elif ("wtime" if self.gs.white_to_move else "btime") in options:
+            side = "w" if self.gs.white_to_move else "b"
+            time_limit = self.ai.think_time(options[side + "time"] / 1000, options.get(side + "inc", 0) / 1000, options.get("movestogo"))
+        if "infinite" in options: time_limit = None; fixed_depth = None
+        self.pondering = "ponder" in options; self.ponder_release.clear()
+        if self.pondering: self.ponder_time_limit = time_limit; time_limit = None
+        self.search_unbounded = self.pondering or (time_limit is None and fixed_depth is None)
+
+        self.ai.stop_requested = False
+        self.search_thread = threading.Thread(target=self.search, args=(self.gs.snapshot(), time_limit, fixed_depth), daemon=True)
+        self.search_thread.start()
+
+    def search(self, gs, time_limit, fixed_depth):
+        valid_moves = gs.get_valid_moves()
+        if not valid_moves:
+            self.send("bestmove 0000"); return
+        start = time.time()
+        best_move, score, nodes, depth = self.ai.find_best_move_smart(gs, valid_moves, time_limit, fixed_depth)
+        # UCI kuralı: ponder sırasında arama bitse de bestmove, ponderhit ya da stop gelene kadar bekletilir
+        if self.pondering: self.ponder_release.wait()
+        elapsed = max(time.time() - start, 1e-6)
+        self.send(f"info depth {max(1, depth)} score {self.format_score(score)} nodes {nodes} time {int(elapsed * 1000)} nps {int(nodes / elapsed)}")
+        gs.make_move(best_move); ponder = self.ai.get_ponder_move(gs)
+        ponder = f" ponder {Move.from_code(ponder, gs.board).get_uci()}" if ponder is not None else ""
+        gs.undo_move()
+        self.send(f"bestmove {best_move.get_uci()}{ponder}")
+
+    def ponder_hit(self):
+        if not self.pondering: return
+        self.pondering = False; self.ponder_release.set()
+        if self.ponder_time_limit:
+            self.ponder_timer = threading.Timer(self.ponder_time_limit, lambda: setattr(self.ai, 'stop_requested', True))
+            self.ponder_timer.daemon = True; self.ponder_timer.start()
+
+    def stop(self):
+        if self.ponder_timer is not None: self.ponder_timer.cancel(); self.ponder_timer = None
+        if self.search_thread is not None and self.search_thread.is_alive():
+            self.ai.stop_requested = True; self.ponder_release.set()
+            self.search_thread.join()
+        self.search_thread = None; self.pondering = False
+
+def main():
+    engine = UCIEngine()
+    for line in sys.stdin:
+        if not engine.handle(line.strip()): return
+    # Girdi bitti (GUI kapandı ya da boru sona erdi): sınırlı arama (depth/movetime/wtime) bitene kadar beklenir,
+    # sonsuz ya da ponder araması "stop" ile bestmove'a zorlanır; ardından "quit"
+    if engine.search_thread is not None and not engine.search_unbounded: engine.search_thread.join()
+    engine.handle("stop"); engine.handle("quit")
+
+if __name__ == "__main__":
+    main()